@@ -1,26 +1,79 @@
 import os
 import json
+import asyncio
 import logging
-from typing import Optional, Tuple, Dict, Any
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Tuple, Dict, Any, AsyncIterator
 import gradio as gr
 from dotenv import load_dotenv
 
-from llama_index.llms.anthropic import Anthropic
-from llama_index.llms.bedrock import Bedrock
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.core import Settings
-from llama_index.core.node_parser import SentenceSplitter
-from llama_index.core.schema import QueryBundle
+try:
+    # orjson は任意依存（perf extra）。大きな検索結果のJSON整形を高速化する
+    import orjson
+except ImportError:
+    orjson = None
 
+# LLM/埋め込み関連の重いモジュール（torch, transformers, boto3 など）は
+# UIの起動を遅らせないよう、実際に使用する箇所で遅延インポートする
 from src.graphrag_anthropic_llamaindex.config_manager import load_config
-from src.graphrag_anthropic_llamaindex.vector_store_manager import get_vector_store
-from src.graphrag_anthropic_llamaindex.global_search import SearchModeRouter
+from src.graphrag_anthropic_llamaindex.query_cache import QueryCache, SemanticQueryCache, make_query_cache_key, normalize_query
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gradioキューの設定（同時に処理する検索数と待機できるリクエスト数）
+QUEUE_CONCURRENCY_LIMIT = 8
+QUEUE_MAX_SIZE = 64
+
+# チャット画面に保持する最大ターン数（履歴全体が毎回送受信されるため上限を設ける）
+DEFAULT_CHAT_HISTORY_WINDOW = 50
+
+# JSON出力に含める最大結果数（大量の結果をシリアライズ・送信しないよう上限を設ける）
+DEFAULT_JSON_MAX_RESULTS = 20
+
+# 検索モードの表示名
+_SEARCH_MODE_NAMES = MappingProxyType({
+    "local": "ローカル検索（詳細・高精度）",
+    "global": "グローバル検索（包括的・要約）",
+    "drift": "DRIFT検索（次世代・実験的）",
+    "auto": "自動選択（クエリに最適な方法を自動選択）"
+})
+
+# 入力検証エラーメッセージ
+_ERROR_NOT_INITIALIZED = "❌ 設定が初期化されていません。まず設定タブで設定を読み込んでください。"
+_ERROR_EMPTY_QUERY = "❌ 検索クエリを入力してください。"
+
+def _dumps_results(result_data: list) -> str:
+    """検索結果を整形済み（インデント2）のJSON文字列に変換（orjson があれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(result_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(result_data, ensure_ascii=False, indent=2, default=str)
+
+@lru_cache(maxsize=8)
+def _make_splitter(chunk_size: int, chunk_overlap: int):
+    """チャンク設定ごとにSentenceSplitterを生成（設定の再読み込み時は再利用）"""
+    from llama_index.core.node_parser import SentenceSplitter
+    return SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
 class GraphRAGApp:
+    # インスタンス属性を固定し、属性アクセスを高速化する
+    __slots__ = (
+        "config", "llm_params", "vector_stores", "is_initialized", "llm_provider",
+        "query_cache", "semantic_cache", "_router_cache", "_router_cache_lock",
+    )
+    
+    # 埋め込みモデルは再初期化のたびにロードし直さないよう、モデル名・精度ごとに保持する
+    _embed_cache: Dict[tuple, Any] = {}
+    # LLMクライアントも同様に保持し、HTTPコネクションプール（keep-alive）を再利用する
+    _llm_cache: Dict[tuple, Any] = {}
+    
+    # Bedrockクライアントのコネクションプール設定
+    BEDROCK_MAX_POOL_CONNECTIONS = 32
+    BEDROCK_MAX_ATTEMPTS = 3
+    
     def __init__(self):
         # Load environment variables from .env file
         load_dotenv()
@@ -29,9 +82,18 @@ class GraphRAGApp:
         self.vector_stores = {}
         self.is_initialized = False
         self.llm_provider = None
+        self.query_cache = QueryCache()
+        self.semantic_cache = SemanticQueryCache(max_size=0)
+        # 検索パラメータごとにSearchModeRouterを保持し、メッセージごとの再構築を避ける
+        self._router_cache: Dict[tuple, Any] = {}
+        self._router_cache_lock = threading.Lock()
     
     def initialize_config(self, config_path: str = "config/config.yaml") -> str:
         try:
+            from llama_index.core import Settings
+            from src.graphrag_anthropic_llamaindex.vector_store_manager import get_vector_store
+            from src.graphrag_anthropic_llamaindex.embedding_cache import CachedEmbedding, DEFAULT_EMBEDDING_CACHE_SIZE
+            
             self.config = load_config(config_path)
             if not self.config:
                 return "❌ 設定ファイルの読み込みに失敗しました"
@@ -83,30 +145,39 @@ class GraphRAGApp:
             
             # Configure embedding model
             embedding_config = self.config.get("embedding_model", {})
-            embed_model_name = embedding_config.get("name", "intfloat/multilingual-e5-small")
-            embed_model = HuggingFaceEmbedding(model_name=embed_model_name)
+            embed_model = self._get_embed_model(embedding_config)
+            embedding_cache_size = self.config.get("embedding_cache_size", DEFAULT_EMBEDDING_CACHE_SIZE)
+            if embedding_cache_size:
+                # 同じクエリの埋め込み計算を省略する
+                embed_model = CachedEmbedding(embed_model, cache_size=embedding_cache_size)
             
             # Configure chunking
             chunking_config = self.config.get("chunking", {})
             chunk_size = chunking_config.get("chunk_size", 1024)
             chunk_overlap = chunking_config.get("chunk_overlap", 20)
-            node_parser = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            node_parser = _make_splitter(chunk_size, chunk_overlap)
             
             # Configure Settings based on provider
+            llm = self._get_llm(self.llm_provider, self.llm_params)
+            Settings.llm = llm
             if self.llm_provider == "bedrock":
-                llm = Bedrock(**self.llm_params)
-                Settings.llm = llm
                 logger.info(f"Using AWS Bedrock with model: {model_name}")
             else:
-                llm = Anthropic(**self.llm_params)
-                Settings.llm = llm
                 logger.info(f"Using Anthropic API with model: {model_name}")
             
             Settings.embed_model = embed_model
             Settings.node_parser = node_parser
             
+            # 設定の再読み込み時はインデックスが変わっている可能性があるため、キャッシュを作り直す
+            self.query_cache = QueryCache.from_config(self.config)
+            self.semantic_cache = SemanticQueryCache.from_config(self.config)
+            with self._router_cache_lock:
+                self._router_cache.clear()
             self.is_initialized = True
             logger.info("Configuration initialized successfully")
+            
+            # 初回クエリでコールドスタートの待ちが発生しないよう、バックグラウンドでウォームアップする
+            threading.Thread(target=self._warmup, name="graphrag-warmup", daemon=True).start()
             return f"✅ 設定が正常に読み込まれました\nLLMプロバイダー: {self.llm_provider}\nモデル: {model_name}"
             
         except Exception as e:
@@ -115,16 +186,48 @@ class GraphRAGApp:
             return error_msg
     
     
-    def search_chat(self, message: str, history: list, search_mode: str, response_type: str, output_format: str, min_community_rank: int, progress=gr.Progress()) -> tuple:
-        if not self.is_initialized:
-            error_msg = "❌ 設定が初期化されていません。まず設定タブで設定を読み込んでください。"
-            history.append([message, error_msg])
-            return "", history
+    async def search_chat(self, message: str, history: list, search_mode: str, response_type: str, output_format: str, min_community_rank: int, progress=gr.Progress()) -> AsyncIterator[tuple]:
+        checks = (
+            (not self.is_initialized, _ERROR_NOT_INITIALIZED),
+            (not message.strip(), _ERROR_EMPTY_QUERY),
+        )
+        for failed, error_msg in checks:
+            if failed:
+                self._append_turn(history, message, error_msg)
+                yield "", history
+                return
+        
+        # 検索結果を左右するパラメータ（完全一致キャッシュと意味的キャッシュで共通）
+        cache_partition = (search_mode, self.config.get("output_dir"), response_type, min_community_rank, output_format)
+        cache_key = make_query_cache_key(normalize_query(message), *cache_partition)
+        cached_response = self.query_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Query cache hit: query='{message}', search_mode={search_mode}")
+            self._append_turn(history, message, cached_response)
+            yield "", history
+            return
+        
+        # 言い換えられた質問は埋め込みの類似度で検索する
+        query_embedding = None
+        if self.semantic_cache.enabled:
+            try:
+                from llama_index.core import Settings
+                query_embedding = await asyncio.to_thread(Settings.embed_model.get_query_embedding, message)
+            except Exception as e:
+                logger.warning(f"Failed to embed query for semantic cache: {e}")
+            if query_embedding is not None:
+                cached_response = self.semantic_cache.lookup(cache_partition, query_embedding)
+                if cached_response is not None:
+                    # 完全一致キャッシュには書き戻さない（書き戻すと有効期限が延長され続けるため）
+                    logger.info(f"Semantic cache hit: query='{message}', search_mode={search_mode}")
+                    self._append_turn(history, message, cached_response)
+                    yield "", history
+                    return
         
-        if not message.strip():
-            error_msg = "❌ 検索クエリを入力してください。"
-            history.append([message, error_msg])
-            return "", history
+        # 検索中であることをすぐに表示し、結果が届き次第同じメッセージを更新する
+        header = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n"
+        self._append_turn(history, message, header + "⏳ 検索中...")
+        yield "", history
         
         try:
             progress(0, desc="検索を開始...")
@@ -132,67 +235,208 @@ class GraphRAGApp:
             
             progress(0.5, desc="検索中...")
             
-            # Use the new SearchModeRouter for unified search interface
-            router = SearchModeRouter(
-                config=self.config,
-                mode=search_mode,
-                vector_store_main=self.vector_stores.get("main"),
-                vector_store_entity=self.vector_stores.get("entity"),
-                vector_store_community=self.vector_stores.get("community"),
-                response_type=response_type,
-                min_community_rank=min_community_rank,
-                output_format=output_format
-            )
-            
-            # Execute search
-            query_bundle = QueryBundle(query_str=message)
-            results = router._retrieve(query_bundle)
+            response = None
+            if search_mode == "drift" and output_format == "markdown":
+                # DRIFT検索は回答をトークン単位でストリーミング表示する
+                streamed = ""
+                try:
+                    async for chunk in self._stream_drift_response(message, response_type, output_format, min_community_rank):
+                        streamed += chunk
+                        history[-1][1] = header + streamed
+                        yield "", history
+                except Exception as e:
+                    # 失敗・途中までの回答はキャッシュせず、通常の検索経路で再試行する
+                    logger.warning(f"DRIFT streaming failed, falling back to router search: {e}")
+                    history[-1][1] = header + "⏳ 検索中..."
+                    yield "", history
+                else:
+                    if streamed:
+                        response = header + streamed
+            
+            if response is None:
+                # 検索はブロッキング処理（ベクター検索・LLM呼び出し）を含むため、
+                # イベントループを塞がないようワーカースレッドで実行する
+                results = await asyncio.to_thread(
+                    self._run_search, message, search_mode, response_type, output_format, min_community_rank
+                )
+                # 大きな結果のJSON整形もイベントループの外で行う
+                response = await asyncio.to_thread(self._format_results, results, search_mode, output_format)
             
             progress(1.0, desc="完了")
             logger.info("Search completed successfully")
             
-            # Format results
-            if results:
-                if output_format == "json":
-                    # JSON形式で結果を整形
-                    result_data = []
-                    for i, node_with_score in enumerate(results):
-                        result_data.append({
-                            "score": node_with_score.score,
-                            "text": node_with_score.node.text,
-                            "metadata": node_with_score.node.metadata
-                        })
-                    response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n```json\n{json.dumps(result_data, ensure_ascii=False, indent=2)}\n```"
-                else:
-                    # Markdown形式で結果を整形
-                    main_result = results[0].node.text if results else "結果が見つかりませんでした。"
-                    response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n{main_result}"
-                    
-                    # 追加のキーポイントがある場合
-                    if len(results) > 1:
-                        response += "\n\n### 📌 キーポイント\n"
-                        for i, node_with_score in enumerate(results[1:], 1):
-                            response += f"\n**ポイント {i}** (スコア: {node_with_score.score:.2f})\n{node_with_score.node.text}\n"
-            else:
-                response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n結果が見つかりませんでした。"
-            
-            history.append([message, response])
-            return "", history
+            self.query_cache.put(cache_key, response)
+            if query_embedding is not None:
+                self.semantic_cache.add(cache_partition, query_embedding, response)
+            history[-1][1] = response
+            yield "", history
             
         except Exception as e:
             error_msg = f"❌ 検索に失敗しました: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            history.append([message, error_msg])
-            return "", history
+            history[-1][1] = error_msg
+            yield "", history
+    
+    def _append_turn(self, history: list, message: str, response: str) -> list:
+        """履歴にターンを追加し、保持ターン数を超えた古いターンを削除（同じリストを更新）"""
+        history.append([message, response])
+        window = (self.config or {}).get("chat_history_window", DEFAULT_CHAT_HISTORY_WINDOW)
+        if window and len(history) > window:
+            del history[:-window]
+        return history
+    
+    def _format_results(self, results: list, search_mode: str, output_format: str) -> str:
+        """検索結果をチャット表示用の文字列に整形"""
+        if results:
+            if output_format == "json":
+                # JSON形式で結果を整形（シリアライズ前に上限件数で切り詰める。0 = 無制限）
+                max_results = (self.config or {}).get("json_max_results", DEFAULT_JSON_MAX_RESULTS)
+                result_data = [
+                    {"score": node_with_score.score, "text": node_with_score.node.text, "metadata": node_with_score.node.metadata}
+                    for node_with_score in (results[:max_results] if max_results else results)
+                ]
+                response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n```json\n{_dumps_results(result_data)}\n```"
+            else:
+                # Markdown形式で結果を整形
+                main_result = results[0].node.text if results else "結果が見つかりませんでした。"
+                response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n{main_result}"
+                
+                # 追加のキーポイントがある場合
+                if len(results) > 1:
+                    response += "\n\n### 📌 キーポイント\n"
+                    for i, node_with_score in enumerate(results[1:], 1):
+                        response += f"\n**ポイント {i}** (スコア: {node_with_score.score:.2f})\n{node_with_score.node.text}\n"
+        else:
+            response = f"🔍 **検索モード**: {self._get_search_mode_name(search_mode)}\n\n結果が見つかりませんでした。"
+        return response
+    
+    async def _stream_drift_response(self, message: str, response_type: str, output_format: str, min_community_rank: int) -> AsyncIterator[str]:
+        """DRIFT検索の回答をストリーミングで生成（DRIFT検索が利用できない場合は何も返さない。失敗時は例外を送出）"""
+        # キャッシュ済みルーターのDRIFT検索エンジンを再利用し、エンティティ・コミュニティのキャッシュを保持する
+        router = await asyncio.to_thread(self._get_router, "drift", response_type, output_format, min_community_rank)
+        drift_engine = getattr(router, "drift_search_engine", None)
+        if drift_engine is None:  # 必要なベクターストアが揃っていない
+            return
+        
+        # エラーを回答テキストとして受け取るとキャッシュされてしまうため、例外として受け取る
+        stream = await drift_engine.search(message, streaming=True, include_context=False, raise_errors=True)
+        async for chunk in stream:
+            yield chunk
+    
+    def _run_search(self, message: str, search_mode: str, response_type: str, output_format: str, min_community_rank: int) -> list:
+        """SearchModeRouterで検索を実行（同期処理）"""
+        from llama_index.core.schema import QueryBundle
+        
+        router = self._get_router(search_mode, response_type, output_format, min_community_rank)
+        
+        # Execute search
+        query_bundle = QueryBundle(query_str=message)
+        return router._retrieve(query_bundle)
+    
+    def _get_router(self, search_mode: str, response_type: str, output_format: str, min_community_rank: int):
+        """検索パラメータに対応するSearchModeRouterを取得（未作成の場合は作成してキャッシュ）"""
+        from src.graphrag_anthropic_llamaindex.global_search import SearchModeRouter
+        
+        key = (search_mode, response_type, min_community_rank, output_format)
+        with self._router_cache_lock:
+            router = self._router_cache.get(key)
+            if router is None:
+                # Use the new SearchModeRouter for unified search interface
+                router = SearchModeRouter(
+                    config=self.config,
+                    mode=search_mode,
+                    vector_store_main=self.vector_stores.get("main"),
+                    vector_store_entity=self.vector_stores.get("entity"),
+                    vector_store_community=self.vector_stores.get("community"),
+                    response_type=response_type,
+                    min_community_rank=min_community_rank,
+                    output_format=output_format
+                )
+                self._router_cache[key] = router
+        return router
+    
+    @classmethod
+    def _get_llm(cls, llm_provider: str, llm_params: Dict[str, Any]):
+        """LLMを取得（同じプロバイダー・パラメータならキャッシュ済みインスタンスとその接続を再利用）"""
+        key = (llm_provider, tuple(sorted(llm_params.items())))
+        llm = cls._llm_cache.get(key)
+        if llm is not None:
+            logger.info("Reusing cached LLM client")
+            return llm
+        
+        # パラメータが変わった場合は古いクライアントを解放する
+        cls._llm_cache.clear()
+        if llm_provider == "bedrock":
+            from botocore.config import Config
+            from llama_index.llms.bedrock import Bedrock
+            botocore_config = Config(
+                max_pool_connections=cls.BEDROCK_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": cls.BEDROCK_MAX_ATTEMPTS, "mode": "adaptive"},
+            )
+            llm = Bedrock(botocore_config=botocore_config, **llm_params)
+        else:
+            from llama_index.llms.anthropic import Anthropic
+            llm = Anthropic(**llm_params)
+        cls._llm_cache[key] = llm
+        return llm
+    
+    @classmethod
+    def _get_embed_model(cls, embedding_config: Dict[str, Any]):
+        """埋め込みモデルを取得（同じモデル名・精度ならキャッシュ済みインスタンスを再利用）"""
+        from src.graphrag_anthropic_llamaindex.embedding_utils import (
+            DEFAULT_EMBED_BATCH_SIZE,
+            DEFAULT_EMBED_MODEL_NAME,
+            create_embedding_model,
+        )
+        
+        model_name = embedding_config.get("name", DEFAULT_EMBED_MODEL_NAME)
+        key = (model_name, embedding_config.get("dtype", "fp32"))
+        embed_model = cls._embed_cache.get(key)
+        if embed_model is not None:
+            logger.info(f"Reusing cached embedding model: {model_name}")
+            embed_model.embed_batch_size = embedding_config.get("embed_batch_size", DEFAULT_EMBED_BATCH_SIZE)
+            return embed_model
+        
+        # モデルが変わった場合は古いモデルを解放する
+        cls._embed_cache.clear()
+        embed_model = create_embedding_model(embedding_config)
+        cls._embed_cache[key] = embed_model
+        return embed_model
+    
+    def _warmup(self) -> None:
+        """埋め込みモデル・ベクターストア・JITカーネルをウォームアップ（バックグラウンドスレッドで実行）"""
+        import time
+        from llama_index.core import Settings
+        from llama_index.core.vector_stores.types import VectorStoreQuery
+        
+        try:
+            start = time.perf_counter()
+            embedding = Settings.embed_model.get_query_embedding("warmup")
+            logger.info(f"Warmup: embedding model ready in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"Warmup: embedding model failed: {e}")
+            return
+        
+        for store_type, vector_store in self.vector_stores.items():
+            if vector_store is None:
+                continue
+            try:
+                start = time.perf_counter()
+                vector_store.query(VectorStoreQuery(query_embedding=[0.0] * len(embedding), similarity_top_k=1))
+                logger.info(f"Warmup: {store_type} vector store ready in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.warning(f"Warmup: {store_type} vector store query failed: {e}")
+        
+        if self.semantic_cache.enabled:
+            from src.graphrag_anthropic_llamaindex.simsearch_kernels import NUMBA_MIN_ROWS, warm_up_kernels
+            # numbaカーネルは NUMBA_MIN_ROWS 行以上の行列でのみ使われるため、小さなキャッシュではコンパイルしない
+            if self.semantic_cache.max_size >= NUMBA_MIN_ROWS:
+                start = time.perf_counter()
+                if warm_up_kernels():
+                    logger.info(f"Warmup: similarity kernels compiled in {time.perf_counter() - start:.2f}s")
     
     def _get_search_mode_name(self, search_mode: str) -> str:
-        mode_names = {
-            "local": "ローカル検索（詳細・高精度）",
-            "global": "グローバル検索（包括的・要約）",
-            "drift": "DRIFT検索（次世代・実験的）",
-            "auto": "自動選択（クエリに最適な方法を自動選択）"
-        }
-        return mode_names.get(search_mode, search_mode)
+        return _SEARCH_MODE_NAMES.get(search_mode, search_mode)
 
 # Global app instance
 app = GraphRAGApp()
@@ -291,8 +535,9 @@ def create_interface():
             clear_btn = gr.Button("チャット履歴をクリア", variant="secondary")
             
             # Event handlers
-            def send_message(message, history, mode, response_type, output_format, min_rank):
-                return app.search_chat(message, history, mode, response_type, output_format, min_rank)
+            async def send_message(message, history, mode, response_type, output_format, min_rank):
+                async for update in app.search_chat(message, history, mode, response_type, output_format, min_rank):
+                    yield update
             
             def clear_chat():
                 return []
@@ -394,6 +639,7 @@ def create_interface():
 
 def main():
     interface = create_interface()
+    interface.queue(default_concurrency_limit=QUEUE_CONCURRENCY_LIMIT, max_size=QUEUE_MAX_SIZE)
     interface.launch(
         server_name="0.0.0.0",
         server_port=7860,
@@ -87,15 +87,15 @@ sleep 2
 # Display graph statistics
 print_step 3 "Knowledge graph statistics:"
 echo ""
-if [ -f "$OUTPUT_DIR/entities.parquet" ]; then
+if [ -e "$OUTPUT_DIR/entities.parquet" ]; then
     ENTITY_COUNT=$(python -c "import pandas as pd; print(len(pd.read_parquet('$OUTPUT_DIR/entities.parquet')))")
     echo "  • Entities extracted: $ENTITY_COUNT"
 fi
-if [ -f "$OUTPUT_DIR/relationships.parquet" ]; then
+if [ -e "$OUTPUT_DIR/relationships.parquet" ]; then
     REL_COUNT=$(python -c "import pandas as pd; print(len(pd.read_parquet('$OUTPUT_DIR/relationships.parquet')))")
     echo "  • Relationships found: $REL_COUNT"
 fi
-if [ -f "$OUTPUT_DIR/community_summaries.parquet" ]; then
+if [ -e "$OUTPUT_DIR/community_summaries.parquet" ]; then
     COMM_COUNT=$(python -c "import pandas as pd; print(len(pd.read_parquet('$OUTPUT_DIR/community_summaries.parquet')))")
     echo "  • Communities detected: $COMM_COUNT"
 fi
@@ -1,11 +1,33 @@
+import copy
 import yaml
 import os
 
+try:
+    # libyaml-backed loader is considerably faster when available
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Parsed configurations keyed by (absolute path, mtime_ns, size)
+_CONFIG_CACHE = {}
+
 def load_config(config_path="config/config.yaml"):
-    """Loads the configuration from a YAML file."""
+    """Loads the configuration from a YAML file.
+
+    Parsed results are cached and reused while the file's modification time
+    and size are unchanged. Callers always receive their own copy.
+    """
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        st = os.stat(config_path)
+        key = (os.path.abspath(config_path), st.st_mtime_ns, st.st_size)
+        if key not in _CONFIG_CACHE:
+            with open(config_path, 'r') as f:
+                config = yaml.load(f, Loader=SafeLoader)
+            # Drop stale entries for the same file
+            for stale_key in [k for k in _CONFIG_CACHE if k[0] == key[0]]:
+                del _CONFIG_CACHE[stale_key]
+            _CONFIG_CACHE[key] = config
+        return copy.deepcopy(_CONFIG_CACHE[key])
     except FileNotFoundError:
         print(f"Error: Configuration file '{config_path}' not found.")
         print("Please copy 'config/config.example.yaml' to 'config/config.yaml' and set your API key.")
@@ -1,5 +1,11 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import os
+import shutil
+import time
+import uuid
 import hashlib
 
 def calculate_file_hash(filepath):
@@ -13,67 +19,299 @@ def calculate_file_hash(filepath):
             hasher.update(chunk)
     return hasher.hexdigest()
 
+def get_file_fingerprint(filepath):
+    """Returns the 'dev:ino:size:mtime_ns' stat fingerprint of a file, or None if it cannot be stat'ed.
+
+    Stored as a single string so parquet never round-trips mtime_ns through float.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return fingerprint_from_stat(st)
+
+def fingerprint_from_stat(st):
+    """Returns the fingerprint for an existing os.stat_result (e.g. from os.DirEntry.stat())."""
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+def get_processed_fingerprints(df):
+    """Returns the (read-only) set of file fingerprints recorded in the processed files DataFrame."""
+    if 'fingerprint' not in df.columns:
+        return frozenset()
+    return frozenset(df['fingerprint'].dropna().tolist())
+
+def mask_processed_hashes(df, hashes):
+    """Returns a boolean list telling which of `hashes` are recorded in the processed files DataFrame.
+
+    Uses a vectorized Arrow membership test instead of building a Python set of all stored hashes.
+    """
+    if df.empty or not hashes:
+        return [False] * len(hashes)
+    value_set = pa.array(df['hash'].to_numpy(dtype=object), type=pa.string())
+    return pc.is_in(pa.array(hashes, type=pa.string()), value_set=value_set).to_pylist()
+
+def record_file_fingerprints(df, fingerprints_by_hash):
+    """Sets the fingerprints of processed files from a {hash: fingerprint} mapping.
+
+    Missing fingerprints are filled in and stale ones (e.g. a file touched or
+    copied without changing its content) are overwritten, so the file is skipped
+    by its fingerprint on the next run instead of being re-read and re-hashed.
+
+    Returns:
+        tuple: (updated DataFrame, number of rows whose fingerprint changed)
+    """
+    df = df.copy()
+    if 'fingerprint' not in df.columns:
+        df['fingerprint'] = None
+    current = df['hash'].map(fingerprints_by_hash)
+    changed = current.notna() & (df['fingerprint'] != current)
+    df.loc[changed, 'fingerprint'] = current[changed]
+    return df, int(changed.sum())
+
+# Parquet write options: zstd compresses noticeably smaller than the default snappy at
+# similar CPU cost, and bounded row groups keep pyarrow's write buffers small
+PARQUET_WRITE_OPTIONS = {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 64_000}
+
+# Explicit schemas for tables with a fixed set of columns; the other tables hold
+# LLM-extracted records whose columns vary, so their schema is inferred per write
+PROCESSED_FILES_SCHEMA = pa.schema([
+    ('filepath', pa.string()),
+    ('hash', pa.string()),
+    ('original_path', pa.string()),
+    ('fingerprint', pa.string()),
+])
+COMMUNITIES_SCHEMA = pa.schema([
+    ('level', pa.int64()),
+    ('cluster_id', pa.int64()),
+    ('parent_cluster', pa.int64()),
+    ('nodes', pa.list_(pa.string())),
+])
+
+# Column sets used to deduplicate rows appended to each table
+ENTITY_KEY_COLUMNS = ['name', 'type']
+RELATIONSHIP_KEY_COLUMNS = ['source', 'target', 'type', 'description']
+COMMUNITY_KEY_COLUMNS = ['level', 'cluster_id']
+COMMUNITY_SUMMARY_KEY_COLUMNS = ['community_id']
+
+# Appends add one part file per run; past this many parts a table is compacted into one
+MAX_TABLE_PARTS = 32
+
+def _list_parts(db_path):
+    """Returns the part files of a table stored as a Parquet dataset directory, oldest first."""
+    return sorted(
+        os.path.join(db_path, name) for name in os.listdir(db_path) if name.endswith('.parquet')
+    )
+
+def _new_part_path(db_path):
+    """Returns a part file path that sorts after all existing parts."""
+    return os.path.join(db_path, f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet")
+
+def _read_parts_table(parts):
+    """Reads part files into one Arrow table, null-filling columns missing from older parts.
+
+    Raises:
+        pa.ArrowInvalid, pa.ArrowTypeError: If the parts' column types conflict
+    """
+    return pa.concat_tables(
+        [pq.read_table(part).replace_schema_metadata(None) for part in parts],
+        promote_options='permissive',
+    )
+
+def _compact_parts(db_path):
+    """Merges all part files of a dataset directory into a single part.
+
+    The merged part is written (under a temporary name, then renamed) before the
+    old parts are removed, so an interrupted compaction can leave duplicate rows
+    but never loses any. Parts whose column types conflict (e.g. a column the LLM
+    filled with numbers in one run and strings in another) are left as they are.
+
+    Returns:
+        bool: True if the parts were merged
+    """
+    parts = _list_parts(db_path)
+    try:
+        table = _read_parts_table(parts)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+    tmp_path = os.path.join(db_path, f".compact-{uuid.uuid4().hex[:8]}.tmp")
+    pq.write_table(table, tmp_path, **PARQUET_WRITE_OPTIONS)
+    os.replace(tmp_path, _new_part_path(db_path))
+    for part in parts:
+        os.remove(part)
+    return True
+
+def _load_db(output_dir, filename, columns):
+    """Loads a table stored either as a single Parquet file or as a dataset directory of parts."""
+    db_path = os.path.join(output_dir, filename)
+    if os.path.isdir(db_path):
+        parts = _list_parts(db_path)
+        if parts:
+            # Converted to pandas once rather than per part; conflicting parts fall back to pandas concat
+            try:
+                return _read_parts_table(parts).to_pandas()
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    elif os.path.exists(db_path):
+        return pd.read_parquet(db_path)
+    return pd.DataFrame(columns=columns)
+
+def _save_db(df, output_dir, filename):
+    """Overwrites a table with the full DataFrame, written as a single Parquet file."""
+    os.makedirs(output_dir, exist_ok=True)
+    db_path = os.path.join(output_dir, filename)
+    if os.path.isdir(db_path):
+        shutil.rmtree(db_path)
+    df.to_parquet(db_path, index=False, **PARQUET_WRITE_OPTIONS)
+
+def _row_keys(df, key_columns):
+    """Returns hashable row keys, treating missing values (None/NaN) as equal like drop_duplicates."""
+    key_df = df.reindex(columns=key_columns).astype(object)
+    key_df = key_df.where(key_df.notna(), None)
+    return list(key_df.itertuples(index=False, name=None))
+
+def _record_key(record, key_columns):
+    """Returns the hashable key of a record (dict), normalizing NaN to None like _row_keys."""
+    values = []
+    for column in key_columns:
+        value = record.get(column)
+        values.append(None if isinstance(value, float) and value != value else value)
+    return tuple(values)
+
+def _load_row_keys(db_path, key_columns):
+    """Returns the set of row keys stored in a dataset directory, reading only the key columns.
+
+    Key columns missing from a part (e.g. relationships extracted without a
+    description) read as None, like the missing values in _record_key.
+    """
+    keys = set()
+    for part in _list_parts(db_path):
+        parquet_file = pq.ParquetFile(part)
+        present = [column for column in key_columns if column in parquet_file.schema_arrow.names]
+        table = parquet_file.read(columns=present)
+        columns = [
+            table.column(column).to_pylist() if column in present else [None] * table.num_rows
+            for column in key_columns
+        ]
+        keys.update(
+            tuple(None if isinstance(value, float) and value != value else value for value in key)
+            for key in zip(*columns)
+        )
+    return keys
+
+def _records_to_table(records, schema=None):
+    """Builds an Arrow table directly from a list of dicts, without going through pandas."""
+    if schema is not None:
+        return pa.Table.from_pylist(records, schema=schema)
+    # from_pylist only takes columns from the first record; use the union of all keys
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    return pa.Table.from_pydict({column: [record.get(column) for record in records] for column in columns})
+
+def _append_db(new_rows, output_dir, filename, key_columns=None, schema=None):
+    """Appends rows to a table as a new part file instead of rewriting the whole table.
+
+    new_rows may be a DataFrame or a list of dicts. Lists are deduplicated in plain
+    Python and written straight to Arrow (with `schema` when the table has a fixed one).
+
+    A legacy single-file table is converted into a dataset directory on first append,
+    and the directory is compacted once it holds more than MAX_TABLE_PARTS parts.
+    When key_columns is given, rows whose key already exists (in the table or earlier
+    in new_rows) are dropped, matching concat + drop_duplicates(keep='first'). Only the
+    key columns of the existing parts are read (via pyarrow) for this check.
+
+    Returns:
+        int: Number of rows appended
+    """
+    db_path = os.path.join(output_dir, filename)
+    os.makedirs(output_dir, exist_ok=True)
+    if os.path.isfile(db_path):
+        legacy_path = db_path + '.legacy'
+        os.replace(db_path, legacy_path)
+        os.makedirs(db_path)
+        os.replace(legacy_path, _new_part_path(db_path))
+    os.makedirs(db_path, exist_ok=True)
+
+    if key_columns:
+        seen = _load_row_keys(db_path, key_columns)
+        if isinstance(new_rows, pd.DataFrame):
+            keys = _row_keys(new_rows, key_columns)
+        else:
+            keys = [_record_key(record, key_columns) for record in new_rows]
+        keep = []
+        for key in keys:
+            keep.append(key not in seen)
+            seen.add(key)
+        if isinstance(new_rows, pd.DataFrame):
+            new_rows = new_rows[keep]
+        else:
+            new_rows = [record for record, kept in zip(new_rows, keep) if kept]
+
+    if len(new_rows) == 0:
+        return 0
+    if isinstance(new_rows, pd.DataFrame):
+        table = pa.Table.from_pandas(new_rows, preserve_index=False)
+    else:
+        table = _records_to_table(new_rows, schema)
+    pq.write_table(table, _new_part_path(db_path), **PARQUET_WRITE_OPTIONS)
+    if len(_list_parts(db_path)) > MAX_TABLE_PARTS:
+        _compact_parts(db_path)
+    return table.num_rows
+
 def load_processed_files_db(output_dir):
     """Loads the processed files DataFrame from a Parquet file within the specified directory."""
-    db_path = os.path.join(output_dir, 'processed_files.parquet')
-    if os.path.exists(db_path):
-        return pd.read_parquet(db_path)
-    return pd.DataFrame(columns=['filepath', 'hash'])
+    return _load_db(output_dir, 'processed_files.parquet', ['filepath', 'hash'])
 
 def save_processed_files_db(df, output_dir):
     """Saves the processed files DataFrame to a Parquet file within the specified directory."""
-    os.makedirs(output_dir, exist_ok=True)
-    db_path = os.path.join(output_dir, 'processed_files.parquet')
-    df.to_parquet(db_path, index=False)
+    _save_db(df, output_dir, 'processed_files.parquet')
+
+def append_processed_files_db(new_rows, output_dir):
+    """Appends newly processed files to the processed files table."""
+    return _append_db(new_rows, output_dir, 'processed_files.parquet', schema=PROCESSED_FILES_SCHEMA)
 
 def load_entities_db(output_dir):
     """Loads the extracted entities DataFrame from a Parquet file."""
-    db_path = os.path.join(output_dir, 'entities.parquet')
-    if os.path.exists(db_path):
-        return pd.read_parquet(db_path)
-    return pd.DataFrame(columns=['name', 'type'])
+    return _load_db(output_dir, 'entities.parquet', ['name', 'type'])
 
 def save_entities_db(df, output_dir):
     """Saves the extracted entities DataFrame to a Parquet file."""
-    os.makedirs(output_dir, exist_ok=True)
-    db_path = os.path.join(output_dir, 'entities.parquet')
-    df.to_parquet(db_path, index=False)
+    _save_db(df, output_dir, 'entities.parquet')
+
+def append_entities_db(new_rows, output_dir):
+    """Appends entities not already stored (by name and type) to the entities table."""
+    return _append_db(new_rows, output_dir, 'entities.parquet', ENTITY_KEY_COLUMNS)
 
 def load_relationships_db(output_dir):
     """Loads the extracted relationships DataFrame from a Parquet file."""
-    db_path = os.path.join(output_dir, 'relationships.parquet')
-    if os.path.exists(db_path):
-        return pd.read_parquet(db_path)
-    return pd.DataFrame(columns=['source', 'target', 'type', 'description'])
+    return _load_db(output_dir, 'relationships.parquet', ['source', 'target', 'type', 'description'])
 
 def save_relationships_db(df, output_dir):
     """Saves the extracted relationships DataFrame to a Parquet file."""
-    os.makedirs(output_dir, exist_ok=True)
-    db_path = os.path.join(output_dir, 'relationships.parquet')
-    df.to_parquet(db_path, index=False)
+    _save_db(df, output_dir, 'relationships.parquet')
+
+def append_relationships_db(new_rows, output_dir):
+    """Appends relationships not already stored to the relationships table."""
+    return _append_db(new_rows, output_dir, 'relationships.parquet', RELATIONSHIP_KEY_COLUMNS)
 
 def load_community_db(output_dir):
     """Loads the detected communities DataFrame from a Parquet file."""
-    db_path = os.path.join(output_dir, 'communities.parquet')
-    if os.path.exists(db_path):
-        return pd.read_parquet(db_path)
-    return pd.DataFrame(columns=['level', 'cluster_id', 'parent_cluster', 'nodes'])
+    return _load_db(output_dir, 'communities.parquet', ['level', 'cluster_id', 'parent_cluster', 'nodes'])
 
 def save_community_db(df, output_dir):
     """Saves the detected communities DataFrame to a Parquet file."""
-    os.makedirs(output_dir, exist_ok=True)
-    db_path = os.path.join(output_dir, 'communities.parquet')
-    df.to_parquet(db_path, index=False)
+    _save_db(df, output_dir, 'communities.parquet')
+
+def append_community_db(new_rows, output_dir):
+    """Appends communities not already stored (by level and cluster_id) to the communities table."""
+    return _append_db(new_rows, output_dir, 'communities.parquet', COMMUNITY_KEY_COLUMNS, COMMUNITIES_SCHEMA)
 
 def load_community_summaries_db(output_dir):
     """Loads the community summaries DataFrame from a Parquet file."""
-    db_path = os.path.join(output_dir, 'community_summaries.parquet')
-    if os.path.exists(db_path):
-        return pd.read_parquet(db_path)
-    return pd.DataFrame(columns=['community_id', 'summary', 'key_entities'])
+    return _load_db(output_dir, 'community_summaries.parquet', ['community_id', 'summary', 'key_entities'])
 
 def save_community_summaries_db(df, output_dir):
     """Saves the community summaries DataFrame to a Parquet file."""
-    os.makedirs(output_dir, exist_ok=True)
-    db_path = os.path.join(output_dir, 'community_summaries.parquet')
-    df.to_parquet(db_path, index=False)
+    _save_db(df, output_dir, 'community_summaries.parquet')
+
+def append_community_summaries_db(new_rows, output_dir):
+    """Appends summaries of communities not already summarized to the community summaries table."""
+    return _append_db(new_rows, output_dir, 'community_summaries.parquet', COMMUNITY_SUMMARY_KEY_COLUMNS)
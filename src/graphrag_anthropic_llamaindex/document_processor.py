@@ -1,32 +1,83 @@
 import os
+import sys
+import asyncio
+import json
+import re
+import numpy as np
 import pandas as pd
 import networkx as nx
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, List
-from llama_index.core.schema import Document
+from llama_index.core.schema import Document, MetadataMode
 from llama_index.core import VectorStoreIndex, StorageContext, SimpleDirectoryReader, Settings
 from llama_index.readers.file import UnstructuredReader
 
 from graphrag_anthropic_llamaindex.db_manager import (
-    calculate_file_hash,
+    get_file_fingerprint,
+    fingerprint_from_stat,
+    get_processed_fingerprints,
+    mask_processed_hashes,
+    record_file_fingerprints,
     load_processed_files_db,
     save_processed_files_db,
-    load_entities_db,
-    save_entities_db,
-    load_relationships_db,
-    save_relationships_db,
-    load_community_db,
-    save_community_db,
-    load_community_summaries_db,
-    save_community_summaries_db,
+    append_processed_files_db,
+    append_entities_db,
+    append_relationships_db,
+    append_community_db,
+    append_community_summaries_db,
 )
 from graphrag_anthropic_llamaindex.file_filter import FileFilter
+from graphrag_anthropic_llamaindex.vector_store_manager import get_project_id, tag_project_metadata
 from graphrag_anthropic_llamaindex.graph_operations import cluster_graph
-from graphrag_anthropic_llamaindex.llm_utils import parse_llm_json_output, extraction_prompt_template, summary_prompt_template, _get_full_llm_response_with_continuation
+from graphrag_anthropic_llamaindex.llm_utils import (
+    parse_llm_json_output,
+    build_extraction_prompt,
+    build_batch_extraction_prompt,
+    build_summary_prompt,
+    _aget_full_llm_response_with_continuation,
+    _run_coroutine,
+    llm_cache_namespace,
+    load_cached_llm_response,
+    save_cached_llm_response,
+)
 import fsspec
 import hashlib
 from pathlib import Path
 
+# Default number of in-flight LLM requests during extraction and summarization
+DEFAULT_LLM_CONCURRENCY = 16
+# Number of completed LLM requests between progress lines
+PROGRESS_INTERVAL = 100
+# Metadata value types vector stores accept as-is; anything else is stored as JSON
+_SCALAR_METADATA_TYPES = (str, int, float, bool, type(None))
+# Any letter or digit in any script; chunks without one are never sent for extraction
+_WORD_CHAR_RE = re.compile(r"\w")
+# Number of CSV rows rendered to text per batch
+CSV_TEXT_BATCH_ROWS = 50_000
+# Character budget of the chunk texts sent in one community summary prompt (~8k tokens)
+DEFAULT_MAX_SUMMARY_INPUT_CHARS = 32_000
+
+# File extensions read with UnstructuredReader; CSV files are split into one document per row
+CSV_EXT = '.csv'
+UNSTRUCTURED_SUPPORTED_EXTS = frozenset((
+    ".txt", ".text", ".eml", ".msg", ".html", ".htm", ".xml", ".json",
+    ".tsv", ".md", ".rst", ".rtf", ".odt", ".doc", ".docx", ".mermaid", ".plantuml",
+    ".ppt", ".pptx", ".pdf", ".png", ".jpg", ".jpeg", ".heic", ".epub",
+))
+
+
+@lru_cache(maxsize=None)
+def _get_file_extractor() -> Dict[str, Any]:
+    """
+    Return the process-wide extension -> reader mapping
+    
+    UnstructuredReader holds no per-file state, so a single instance serves every
+    extension and every add_documents call. SimpleDirectoryReader adds default
+    readers for other extensions to this dict, and those are reused as well.
+    """
+    return dict.fromkeys(UNSTRUCTURED_SUPPORTED_EXTS, UnstructuredReader())
 
 
 def add_documents(
@@ -38,8 +89,31 @@ def add_documents(
     community_detection_config=None,
     use_archive_reader=True,
     file_filter=None,
+    max_workers=None,
+    max_concurrent_llm_calls=None,
+    use_llm_cache=True,
+    min_chunk_chars=0,
+    extraction_batch_chars=0,
+    project_id=None,
 ):
-    """Adds documents from the data directory to the index."""
+    """Adds documents from the data directory to the index.
+
+    File reads and chunking run in a thread pool of `max_workers` threads
+    (defaults to os.cpu_count()); embedding and vector store inserts are
+    batched by VectorStoreIndex using the embed model's embed_batch_size.
+    Entity extraction and community summarization keep up to
+    `max_concurrent_llm_calls` LLM requests in flight (defaults to 16).
+    With `use_llm_cache`, their responses are cached under `output_dir/llm_cache`
+    so re-runs over the same chunks do not call the LLM again. Chunks without
+    any word characters, or shorter than `min_chunk_chars`, are not sent for
+    extraction. With `extraction_batch_chars`, consecutive chunks are packed into
+    one extraction prompt up to that many characters of chunk text, so fewer
+    (larger) LLM requests are made. The chunks are embedded on a worker thread
+    while entities are extracted and communities are summarized; the vector
+    indexes are only written after every LLM stage has succeeded. Documents are
+    tagged with `project_id` (defaults to the resolved output_dir) so searches
+    over a shared vector store can be restricted to this project.
+    """
     print(f"Adding documents from '{input_dir}'...")
     
     # LLM設定の確認と初期化
@@ -54,16 +128,11 @@ def add_documents(
         file_filter = FileFilter()
     
     processed_files_df = load_processed_files_db(output_dir)
-    processed_hashes = set(processed_files_df['hash'].tolist())
+    # Files whose (dev, ino, size, mtime_ns) is unchanged since they were processed are not re-read
+    processed_fingerprints = get_processed_fingerprints(processed_files_df)
     newly_processed_files = []
 
-    # Define supported file extensions
-    unstructured_supported_exts = [
-        ".txt", ".text", ".eml", ".msg", ".html", ".htm", ".xml", ".json",
-        ".tsv", ".md", ".rst", ".rtf", ".odt", ".doc", ".docx", ".mermaid", ".plantuml",
-        ".ppt", ".pptx", ".pdf", ".png", ".jpg", ".jpeg", ".heic", ".epub",
-    ]
-    file_extractor = {ext: UnstructuredReader() for ext in unstructured_supported_exts}
+    file_extractor = _get_file_extractor()
     
     # Load documents with unified processing logic
     print("Loading documents...")
@@ -72,193 +141,110 @@ def add_documents(
         file_extractor=file_extractor,
         show_progress=True,
         file_filter=file_filter,
-        use_archive_reader=use_archive_reader
+        use_archive_reader=use_archive_reader,
+        max_workers=max_workers,
+        processed_fingerprints=processed_fingerprints
     )
     
-    # Process documents and check for duplicates
-    for doc in all_documents:
-        # Get document source path (virtual or physical)
-        source_path = doc.extra_info.get('virtual_path', 
-                                        doc.extra_info.get('source_path',
-                                                          doc.extra_info.get('file_name', 'unknown')))
-        
-        # Calculate hash for duplicate detection using SHA-256
-        doc_hash = _calculate_document_hash(doc.text, source_path)
-        
-        if doc_hash in processed_hashes:
+    source_paths = [_get_document_source_path(doc) for doc in all_documents]
+    doc_hashes = _hash_documents(all_documents, source_paths, max_workers)
+    already_processed = mask_processed_hashes(processed_files_df, doc_hashes)
+
+    # Check for duplicates and keep only new documents in a single pass
+    new_documents = []
+    file_fingerprints = {}
+    fingerprint_updates = {}  # hash -> current fingerprint of processed documents whose stored one is missing or stale
+    for doc, source_path, doc_hash, is_processed in zip(all_documents, source_paths, doc_hashes, already_processed):
+        physical_path = _get_document_physical_path(doc)
+        if physical_path not in file_fingerprints:
+            file_fingerprints[physical_path] = get_file_fingerprint(physical_path) if physical_path else None
+        fingerprint = file_fingerprints[physical_path]
+
+        if is_processed:
             print(f"Skipping already processed document: {source_path}")
+            if fingerprint and fingerprint not in processed_fingerprints:
+                fingerprint_updates[doc_hash] = fingerprint
             continue
         
         newly_processed_files.append({
             'filepath': source_path,
             'hash': doc_hash,
-            'original_path': doc.extra_info.get('source_archive', source_path)
+            'original_path': doc.extra_info.get('source_archive', source_path),
+            'fingerprint': fingerprint
         })
+        new_documents.append(doc)
         
         print(f"Added document: {source_path}")
-    
-    # Filter out already processed documents
-    all_documents = [doc for doc in all_documents 
-                    if _calculate_document_hash(doc.text, 
-                                               doc.extra_info.get('virtual_path', 
-                                                                 doc.extra_info.get('source_path',
-                                                                                   doc.extra_info.get('file_name', 'unknown')))) 
-                    not in processed_hashes]
+    all_documents = new_documents
+
+    if fingerprint_updates:
+        updated_files_df, changed_count = record_file_fingerprints(processed_files_df, fingerprint_updates)
+        # Refreshing existing rows is the only case that rewrites the whole table, so it is skipped when nothing changed
+        if changed_count:
+            save_processed_files_db(updated_files_df, output_dir)
 
     if not all_documents:
         print("No new documents to add.")
         return
 
+    # Tag documents with their project so searches can pre-filter shared vector stores
+    project_id = get_project_id(output_dir, project_id)
+    tag_project_metadata(all_documents, project_id)
+
     try:
         # Chunk documents into nodes
-        node_parser = Settings.node_parser
-        nodes = node_parser.get_nodes_from_documents(all_documents)
+        nodes = _parse_nodes_parallel(Settings.node_parser, all_documents, max_workers)
 
-        extracted_entities_list = []
-        extracted_relationships_list = []
-        entity_documents = [] # For entity vector store
+        # Parquet appends are deferred and flushed together once all indexes are built
+        pending_tables = [] # (append function, records, table file name)
 
-        print("Extracting entities and relationships from document chunks...")
-        for i, node in enumerate(nodes):
-            try:
-                prompt = extraction_prompt_template.format(text=node.text)
-                json_output = _get_full_llm_response_with_continuation(prompt)
-                result = parse_llm_json_output(json_output)
-                
-                if result:
-                    for entity in result.get('entities', []):
-                        extracted_entities_list.append(entity)
-                        entity_documents.append(Document(text=entity.get('name', ''), extra_info=entity))
-                    for relationship in result.get('relationships', []):
-                        extracted_relationships_list.append(relationship)
-                print(f"  Processed chunk {i+1}/{len(nodes)}")
-            except Exception as e:
-                print(f"  Error extracting from chunk {i+1}: {e}")
-                traceback.print_exc()
-                raise RuntimeError(f"Entity extraction failed for chunk {i+1}") from e
-
-        # Save extracted entities and relationships to Parquet
-        if extracted_entities_list:
-            new_entities_df = pd.DataFrame(extracted_entities_list)
-            existing_entities_df = load_entities_db(output_dir)
-            updated_entities_df = pd.concat([existing_entities_df, new_entities_df], ignore_index=True).drop_duplicates(subset=['name', 'type'])
-            save_entities_db(updated_entities_df, output_dir)
-            print(f"Saved {len(new_entities_df)} new entities to {output_dir}/entities.parquet")
-
-        if extracted_relationships_list:
-            new_relationships_df = pd.DataFrame(extracted_relationships_list)
-            existing_relationships_df = load_relationships_db(output_dir)
-            updated_relationships_df = pd.concat([existing_relationships_df, new_relationships_df], ignore_index=True).drop_duplicates()
-            save_relationships_db(updated_relationships_df, output_dir)
-            print(f"Saved {len(new_relationships_df)} new relationships to {output_dir}/relationships.parquet")
-
-        # --- Community Detection ---
-        if extracted_relationships_list and community_detection_config:
-            print("Performing community detection...")
-            graph = nx.Graph()
-            for rel in extracted_relationships_list:
-                graph.add_edge(rel['source'], rel['target'])
-            
-            max_cluster_size = community_detection_config.get("max_cluster_size", 10)
-            use_lcc = community_detection_config.get("use_lcc", True)
-            seed = community_detection_config.get("seed", 42)
-
-            communities = cluster_graph(graph, max_cluster_size, use_lcc, seed)
-            
-            if communities:
-                new_communities_df = pd.DataFrame(communities, columns=['level', 'cluster_id', 'parent_cluster', 'nodes'])
-                existing_communities_df = load_community_db(output_dir)
-                updated_communities_df = pd.concat([existing_communities_df, new_communities_df], ignore_index=True).drop_duplicates(subset=['level', 'cluster_id'])
-                save_community_db(updated_communities_df, output_dir)
-                print(f"Saved {len(new_communities_df)} new communities to {output_dir}/communities.parquet")
-
-                # --- Community Summarization ---
-                print("Generating community summaries...")
-                
-                extracted_community_summaries = []
-                community_summary_documents = [] # For community summary vector store
-
-                entity_to_node_text = {}
-                for node in nodes:
-                    temp_prompt = extraction_prompt_template.format(text=node.text)
-                    temp_json_output = _get_full_llm_response_with_continuation(temp_prompt)
-                    temp_result = parse_llm_json_output(temp_json_output)
-                    if temp_result:
-                        for entity in temp_result.get('entities', []):
-                            entity_to_node_text[entity.get('name', '')] = node.text
-                
-                for community_level, community_id, _, community_nodes in communities:
-                    community_text_parts = []
-                    key_entities_in_community = []
-                    for entity_name in community_nodes:
-                        if entity_name in entity_to_node_text:
-                            community_text_parts.append(entity_to_node_text[entity_name])
-                            key_entities_in_community.append(entity_name)
-                    
-                    if community_text_parts:
-                        combined_community_text = " ".join(community_text_parts)
-                        try:
-                            prompt = summary_prompt_template.format(text=combined_community_text)
-                            json_output = _get_full_llm_response_with_continuation(prompt)
-                            summary_dict = parse_llm_json_output(json_output)
-                            
-                            if summary_dict:
-                                summary_dict['community_id'] = community_id # Ensure community_id is set
-                                extracted_community_summaries.append(summary_dict)
-                                # Flatten metadata for vector store compatibility
-                                flat_metadata = {}
-                                for key, value in summary_dict.items():
-                                    if isinstance(value, (str, int, float, type(None))):
-                                        flat_metadata[key] = value
-                                    else:
-                                        flat_metadata[key] = str(value)
-                                community_summary_documents.append(Document(text=summary_dict.get('summary', ''), extra_info=flat_metadata))
-                                print(f"  Summarized community {community_id} (Level {community_level})")
-                        except Exception as e:
-                            print(f"  Error summarizing community {community_id}: {e}")
-                            raise RuntimeError(f"Community summarization failed for community {community_id}") from e
-            
-                if extracted_community_summaries:
-                    new_summaries_df = pd.DataFrame(extracted_community_summaries)
-                    existing_summaries_df = load_community_summaries_db(output_dir)
-                    updated_summaries_df = pd.concat([existing_summaries_df, new_summaries_df], ignore_index=True).drop_duplicates(subset=['community_id'])
-                    save_community_summaries_db(updated_summaries_df, output_dir)
-                    print(f"Saved {len(new_summaries_df)} new community summaries to {output_dir}/community_summaries.parquet")
-
-                # Create/Update community summary vector index
-                if community_summary_documents:
-                    try:
-                        if community_vector_store:
-                            community_storage_context = StorageContext.from_defaults(vector_store=community_vector_store)
-                            community_index = VectorStoreIndex(community_summary_documents, storage_context=community_storage_context)
-                        else:
-                            community_index_dir = os.path.join(output_dir, "community_summaries_index")
-                            os.makedirs(community_index_dir, exist_ok=True)
-                            community_index = VectorStoreIndex(community_summary_documents)
-                            community_index.storage_context.persist(persist_dir=community_index_dir)
-                        print("Community summary vector index updated.")
-                    except Exception as e:
-                        print(f"Error creating community summary vector index: {e}")
-                        raise RuntimeError("Community summary vector index creation failed") from e
-                else:
-                    print("No community summaries extracted for indexing.")
-            else:
-                print("No communities detected.")
-        else:
-            print("No relationships extracted for community detection.")
+        # The chunks are embedded on a worker thread while the LLM stages run; the main
+        # text index is only written once every LLM stage has succeeded, so a failed run
+        # leaves no nodes in the vector store (its files are not recorded as processed)
+        with ThreadPoolExecutor(max_workers=1) as index_executor:
+            embed_future = index_executor.submit(_embed_nodes, nodes)
 
-        # Create/Update main text index
+            max_concurrent_llm_calls = max_concurrent_llm_calls or DEFAULT_LLM_CONCURRENCY
+            llm_cache_dir = os.path.join(output_dir, "llm_cache") if use_llm_cache else None
+            # Both LLM stages run on one event loop: the LLM's async HTTP client keeps its
+            # pooled connections bound to the loop they were opened on
+            extracted_entities_list, community_summary_documents = _run_coroutine(_run_llm_stages(
+                nodes, pending_tables, community_detection_config, max_concurrent_llm_calls,
+                llm_cache_dir, min_chunk_chars, extraction_batch_chars,
+            ))
+
+            # Wait for the chunk embeddings (re-raises their error, if any)
+            embed_future.result()
+
+        # Entity documents are only built here, so they are not held in memory through community summarization
+        entity_documents = [Document(text=entity.get('name', ''), extra_info=entity) for entity in extracted_entities_list]
+        tag_project_metadata(community_summary_documents, project_id)
+        tag_project_metadata(entity_documents, project_id)
+        # Both indexes are embedded in one batched call (after the chunks, so the embed model is not shared between threads)
         try:
-            if vector_store:
-                storage_context = StorageContext.from_defaults(vector_store=vector_store)
-                index = VectorStoreIndex(nodes, storage_context=storage_context)
-            else:
-                index = VectorStoreIndex(nodes)
-                index.storage_context.persist(persist_dir=output_dir)
-            print("Main text index updated.")
+            _embed_nodes(community_summary_documents + entity_documents)
         except Exception as e:
-            print(f"Error creating main text index: {e}")
-            raise RuntimeError("Main text index creation failed") from e
+            print(f"Error embedding community summaries and entities: {e}")
+            raise RuntimeError("Community summary and entity embedding failed") from e
+
+        # All LLM and embedding work has succeeded, so the vector indexes are written now
+        _build_main_index(nodes, vector_store, output_dir)
+
+        # Create/Update community summary vector index
+        if community_summary_documents:
+            try:
+                if community_vector_store:
+                    community_storage_context = StorageContext.from_defaults(vector_store=community_vector_store)
+                    community_index = VectorStoreIndex(community_summary_documents, storage_context=community_storage_context)
+                else:
+                    community_index_dir = os.path.join(output_dir, "community_summaries_index")
+                    os.makedirs(community_index_dir, exist_ok=True)
+                    community_index = VectorStoreIndex(community_summary_documents)
+                    community_index.storage_context.persist(persist_dir=community_index_dir)
+                print("Community summary vector index updated.")
+            except Exception as e:
+                print(f"Error creating community summary vector index: {e}")
+                raise RuntimeError("Community summary vector index creation failed") from e
 
         # Create/Update entity vector index
         if entity_documents:
@@ -279,9 +265,11 @@ def add_documents(
         else:
             print("No entities extracted for indexing.")
 
-        # Update and save the processed files database
-        updated_df = pd.concat([processed_files_df, pd.DataFrame(newly_processed_files)], ignore_index=True)
-        save_processed_files_db(updated_df, output_dir)
+        # Save extracted tables to Parquet in one flush
+        _flush_tables(pending_tables, output_dir)
+
+        # Update and save the processed files database last, so a failed run is retried in full
+        append_processed_files_db(newly_processed_files, output_dir)
 
         print("Documents and entities processed successfully.")
     except Exception as e:
@@ -292,14 +280,396 @@ def add_documents(
 
 # Archive processing functions
 
-# Supported archive formats
-_SUPPORTED_ARCHIVE_FORMATS = ['.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2']
+# Supported archive formats and the fsspec filesystem protocol that reads each
+_ARCHIVE_PROTOCOLS = {'.zip': 'zip', '.tar': 'tar', '.tar.gz': 'tar', '.tgz': 'tar', '.tar.bz2': 'tar'}
+_SUPPORTED_ARCHIVE_FORMATS = list(_ARCHIVE_PROTOCOLS)
+# Read buffer size of opened archive files
+ARCHIVE_READ_BUFFER_SIZE = 4 * 1024 * 1024
+# Threads reading the CSV members of one zip archive (archives themselves are also read concurrently)
+ARCHIVE_MEMBER_WORKERS = 4
+
+
+async def _run_llm_stages(
+    nodes: list,
+    pending_tables: List[tuple],
+    community_detection_config: Dict[str, Any],
+    max_concurrent_llm_calls: int,
+    llm_cache_dir: str,
+    min_chunk_chars: int,
+    extraction_batch_chars: int,
+) -> tuple:
+    """
+    Extract entities and relationships from the chunks, then detect and summarize communities
+    
+    Args:
+        nodes: Document chunks
+        pending_tables: Deferred Parquet appends; the extracted tables are added to it
+        community_detection_config: Community detection settings (communities are skipped if empty)
+        max_concurrent_llm_calls: Maximum in-flight LLM requests
+        llm_cache_dir: Directory of cached LLM responses (None disables the cache)
+        min_chunk_chars: Chunks shorter than this are not sent for extraction
+        extraction_batch_chars: Pack consecutive chunks into one prompt up to this many characters (0 disables)
+        
+    Returns:
+        tuple: (extracted entities, community summary Documents)
+    """
+    extracted_entities_list = []
+    extracted_relationships_list = []
+    entity_to_node_text = {} # Source chunk text of each entity, used for community summaries
+    collect_node_text = bool(community_detection_config) # The map is only read when summarizing communities
+    community_summary_documents = [] # For community summary vector store
+
+    print("Extracting entities and relationships from document chunks...")
+    # Chunks that cannot contain entities (no word characters, or shorter than min_chunk_chars) skip the LLM
+    extraction_indices = [i for i, node in enumerate(nodes) if _may_contain_entities(node.text, min_chunk_chars)]
+    if len(extraction_indices) < len(nodes):
+        print(f"  Skipping {len(nodes) - len(extraction_indices)} chunks without extractable text")
+    # Consecutive chunks can share one prompt (up to extraction_batch_chars of chunk text)
+    if extraction_batch_chars:
+        extraction_groups = _pack_chunks(nodes, extraction_indices, extraction_batch_chars)
+        print(f"  Packed {len(extraction_indices)} chunks into {len(extraction_groups)} extraction prompts")
+    else:
+        extraction_groups = [[i] for i in extraction_indices]
+    extraction_prompts = [
+        build_extraction_prompt(nodes[group[0]].text) if len(group) == 1 else build_batch_extraction_prompt([nodes[i].text for i in group])
+        for group in extraction_groups
+    ]
+    extraction_outputs = await _complete_prompts(extraction_prompts, max_concurrent_llm_calls, llm_cache_dir, progress_label="extraction prompts" if extraction_batch_chars else "chunks", parse_json=True)
+    del extraction_prompts
+    _raise_for_failed_prompts(extraction_outputs, [_chunk_group_label(group) for group in extraction_groups], "Entity extraction", "extracting from")
+    for output_index, group in enumerate(extraction_groups):
+        for node_index, result in _split_extraction_result(group, extraction_outputs[output_index]):
+            for entity in result.get('entities', []):
+                extracted_entities_list.append(entity)
+                if collect_node_text and node_index is not None:
+                    entity_to_node_text[entity.get('name', '')] = nodes[node_index].text
+            for relationship in result.get('relationships', []):
+                extracted_relationships_list.append(relationship)
+        # Release each parsed response once its rows have been collected
+        extraction_outputs[output_index] = None
+    del extraction_outputs
+
+    if extracted_entities_list:
+        pending_tables.append((append_entities_db, extracted_entities_list, "entities.parquet"))
+
+    if extracted_relationships_list:
+        pending_tables.append((append_relationships_db, extracted_relationships_list, "relationships.parquet"))
+
+    # --- Community Detection ---
+    if extracted_relationships_list and community_detection_config:
+        print("Performing community detection...")
+        graph = nx.Graph()
+        # Deduplicate edges in insertion order (a set would reorder them per run and change the seeded clustering)
+        graph.add_edges_from(dict.fromkeys((rel['source'], rel['target']) for rel in extracted_relationships_list))
+
+        max_cluster_size = community_detection_config.get("max_cluster_size", 10)
+        use_lcc = community_detection_config.get("use_lcc", True)
+        seed = community_detection_config.get("seed", 42)
+
+        communities = cluster_graph(graph, max_cluster_size, use_lcc, seed)
+
+        if communities:
+            community_records = [
+                {'level': level, 'cluster_id': cluster_id, 'parent_cluster': parent_cluster, 'nodes': [str(node) for node in community_nodes]}
+                for level, cluster_id, parent_cluster, community_nodes in communities
+            ]
+            pending_tables.append((append_community_db, community_records, "communities.parquet"))
+
+            # --- Community Summarization ---
+            print("Generating community summaries...")
+
+            extracted_community_summaries = []
+
+            max_summary_input_chars = community_detection_config.get("max_summary_input_chars", DEFAULT_MAX_SUMMARY_INPUT_CHARS)
+            summary_targets = []
+            summary_prompts = []
+            for community_level, community_id, _, community_nodes in communities:
+                # Entities extracted from the same chunk share its text; include each chunk once
+                community_text_parts = list(dict.fromkeys(
+                    entity_to_node_text[entity_name] for entity_name in community_nodes if entity_name in entity_to_node_text
+                ))
+
+                if community_text_parts:
+                    combined_community_text, dropped_parts = _join_within_budget(community_text_parts, max_summary_input_chars)
+                    if dropped_parts:
+                        print(f"  Community {community_id}: dropped {dropped_parts} of {len(community_text_parts)} chunk texts over the {max_summary_input_chars}-character summary budget")
+                    summary_targets.append((community_level, community_id))
+                    summary_prompts.append(build_summary_prompt(combined_community_text))
+
+            # Summary prompts are much larger than extraction prompts, so their concurrency can be capped separately
+            summary_concurrency = community_detection_config.get("summary_concurrency", max_concurrent_llm_calls)
+            summary_outputs = await _complete_prompts(summary_prompts, summary_concurrency, llm_cache_dir, progress_label="communities", parse_json=True)
+            del summary_prompts
+            _raise_for_failed_prompts(summary_outputs, [f"community {community_id}" for _, community_id in summary_targets], "Community summarization", "summarizing")
+            for (community_level, community_id), summary_dict in zip(summary_targets, summary_outputs):
+                if summary_dict:
+                    # Copied because communities with identical prompts share one parsed response
+                    summary_dict = {**summary_dict, 'community_id': community_id} # Ensure community_id is set
+                    extracted_community_summaries.append(summary_dict)
+                    community_summary_documents.append(Document(text=summary_dict.get('summary', ''), extra_info=_flatten_metadata(summary_dict)))
+                    print(f"  Summarized community {community_id} (Level {community_level})")
+
+            if extracted_community_summaries:
+                pending_tables.append((append_community_summaries_db, extracted_community_summaries, "community_summaries.parquet"))
+            else:
+                print("No community summaries extracted for indexing.")
+        else:
+            print("No communities detected.")
+    else:
+        print("No relationships extracted for community detection.")
+
+    return extracted_entities_list, community_summary_documents
+
+
+def _flush_tables(pending_tables: List[tuple], output_dir: str) -> None:
+    """
+    Append the collected records of every table, writing the tables concurrently
+    
+    Args:
+        pending_tables: (append function, records, table file name) tuples
+        output_dir: Output directory
+    """
+    if not pending_tables:
+        return
+    with ThreadPoolExecutor(max_workers=len(pending_tables)) as executor:
+        futures = [
+            (executor.submit(append_fn, records, output_dir), table_name)
+            for append_fn, records, table_name in pending_tables
+        ]
+        for future, table_name in futures:
+            saved_count = future.result()
+            print(f"Saved {saved_count} new rows to {output_dir}/{table_name}")
+
+
+def _build_main_index(nodes: list, vector_store, output_dir: str) -> None:
+    """Create/Update the main text index from the document chunks (already embedded by _embed_nodes)"""
+    try:
+        if vector_store:
+            storage_context = StorageContext.from_defaults(vector_store=vector_store)
+            VectorStoreIndex(nodes, storage_context=storage_context)
+        else:
+            index = VectorStoreIndex(nodes)
+            index.storage_context.persist(persist_dir=output_dir)
+        print("Main text index updated.")
+    except Exception as e:
+        print(f"Error creating main text index: {e}")
+        raise RuntimeError("Main text index creation failed") from e
+
+
+def _flatten_metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten metadata for vector store compatibility, JSON-encoding non-scalar values (e.g. key_entities lists)"""
+    return {
+        key: value if type(value) in _SCALAR_METADATA_TYPES else json.dumps(value, ensure_ascii=False)
+        for key, value in record.items()
+    }
+
+
+def _may_contain_entities(text: str, min_chars: int = 0) -> bool:
+    """Return False for chunks that cannot yield entities: shorter than min_chars or without any word character"""
+    return len(text) >= min_chars and _WORD_CHAR_RE.search(text) is not None
+
+
+def _pack_chunks(nodes: list, indices: List[int], max_chars: int) -> List[List[int]]:
+    """
+    Group node indices in order so the chunk texts of each group total at most max_chars
+    
+    A chunk longer than max_chars forms a group of its own.
+    
+    Args:
+        nodes: Document chunks
+        indices: Indices of the nodes to group
+        max_chars: Maximum total text length of a group
+        
+    Returns:
+        List[List[int]]: Groups of node indices
+    """
+    groups = []
+    group, group_chars = [], 0
+    for i in indices:
+        text_length = len(nodes[i].text)
+        if group and group_chars + text_length > max_chars:
+            groups.append(group)
+            group, group_chars = [], 0
+        group.append(i)
+        group_chars += text_length
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _chunk_group_label(group: List[int]) -> str:
+    """Label of an extraction prompt's chunks for error messages, e.g. 'chunk 3' or 'chunks 3-7'"""
+    return f"chunk {group[0]+1}" if len(group) == 1 else f"chunks {group[0]+1}-{group[-1]+1}"
+
+
+def _split_extraction_result(group: List[int], result) -> list:
+    """
+    Pair each chunk of an extraction prompt with its part of the parsed response
+    
+    A single-chunk prompt's response is the chunk's result. A batched prompt's
+    response holds one 'chunks' item per chunk number; items with an unknown
+    number are paired with None so their entities are still kept.
+    
+    Args:
+        group: Node indices of the prompt's chunks
+        result: Parsed response (None when malformed)
+        
+    Returns:
+        list: (node index or None, result dict) tuples
+    """
+    if not result:
+        return []
+    if len(group) == 1:
+        return [(group[0], result)]
+    pairs = []
+    for item in result.get('chunks', []):
+        if not isinstance(item, dict):
+            continue
+        number = item.get('chunk')
+        node_index = group[number - 1] if isinstance(number, int) and 1 <= number <= len(group) else None
+        pairs.append((node_index, item))
+    return pairs
+
+
+def _join_within_budget(parts: List[str], max_chars: int) -> tuple:
+    """
+    Join texts with spaces, stopping before the joined text exceeds max_chars
+    
+    The first part is always included (truncated if it alone exceeds the budget),
+    so a community with any source text still gets a summary prompt.
+    
+    Args:
+        parts: Texts to join, in priority order
+        max_chars: Maximum length of the joined text
+        
+    Returns:
+        tuple: (joined text, number of parts left out)
+    """
+    selected = [parts[0][:max_chars]]
+    total = len(selected[0])
+    for part in parts[1:]:
+        total += 1 + len(part)
+        if total > max_chars:
+            break
+        selected.append(part)
+    return " ".join(selected), len(parts) - len(selected)
+
+
+def _embed_nodes(nodes: list) -> None:
+    """
+    Embed nodes in one batched call, computing each distinct embedding text once
+    
+    VectorStoreIndex does not embed nodes that already carry an embedding, so
+    indexes built from these nodes only write them. Duplicates (e.g. the same
+    entity extracted from many chunks) share a single embedding.
+    
+    Args:
+        nodes: Nodes (or Documents) about to be indexed; must already have their final metadata
+    """
+    if not nodes:
+        return
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    unique_texts = list(dict.fromkeys(texts))
+    print(f"Embedding {len(unique_texts)} unique texts for {len(texts)} nodes...")
+    embeddings = Settings.embed_model.get_text_embedding_batch(unique_texts, show_progress=True)
+    embedding_by_text = dict(zip(unique_texts, embeddings))
+    for node, text in zip(nodes, texts):
+        node.embedding = embedding_by_text[text]
+
+
+def _raise_for_failed_prompts(outputs: list, item_labels: List[str], stage: str, action: str) -> None:
+    """
+    Report every failed LLM request of a stage, then abort the run
+    
+    All requests have completed by the time this is called, so every failure is
+    listed at once. Successful responses are already in the LLM cache, so a
+    re-run only requests the failed items again.
+    
+    Args:
+        outputs: Results of _complete_prompts (response or exception)
+        item_labels: Label of each item, e.g. "chunk 3"
+        stage: Stage name used in the raised error, e.g. "Entity extraction"
+        action: Verb used in the per-item messages, e.g. "extracting from"
+    """
+    failures = [(label, output) for label, output in zip(item_labels, outputs) if isinstance(output, Exception)]
+    if not failures:
+        return
+    for label, error in failures:
+        print(f"  Error {action} {label}: {error}")
+    traceback.print_exception(failures[0][1])
+    raise RuntimeError(f"{stage} failed for {len(failures)} of {len(outputs)} items (first: {failures[0][0]})") from failures[0][1]
+
+
+async def _complete_prompts(prompts: List[str], max_concurrent: int, cache_dir: str = None, progress_label: str = None, parse_json: bool = False) -> list:
+    """
+    Run prompts through the LLM with up to max_concurrent requests in flight
+    
+    Identical prompts (e.g. repeated chunks) are requested once and share the response.
+    
+    Args:
+        prompts: Prompts to complete
+        max_concurrent: Maximum number of concurrent LLM requests
+        cache_dir: Directory of the persistent response cache (None disables it)
+        progress_label: When given, progress is printed every PROGRESS_INTERVAL completions
+        parse_json: Return the parsed JSON (None when malformed) instead of the response text,
+            reusing the parse done for the cache check
+        
+    Returns:
+        list: Response text or parsed JSON (or the raised exception) for each prompt, in input order
+    """
+    unique_prompts = list(dict.fromkeys(prompts))
+    semaphore = asyncio.Semaphore(max_concurrent)
+    cache_namespace = llm_cache_namespace() if cache_dir else ""
+    # Every lookup is a definite miss until the cache directory exists, so skip them on first runs
+    lookup_cache = bool(cache_dir) and os.path.isdir(cache_dir)
+    completed = 0
+
+    def report_progress() -> None:
+        nonlocal completed
+        completed += 1
+        if progress_label and (completed % PROGRESS_INTERVAL == 0 or completed == len(unique_prompts)):
+            print(f"  Processed {completed}/{len(unique_prompts)} {progress_label}")
+
+    async def complete(prompt: str):
+        if lookup_cache:
+            cached_response = load_cached_llm_response(cache_dir, prompt, cache_namespace)
+            if cached_response is not None:
+                report_progress()
+                return parse_llm_json_output(cached_response) if parse_json else cached_response
+        try:
+            async with semaphore:
+                response_text = await _aget_full_llm_response_with_continuation(prompt)
+        finally:
+            report_progress()
+        parsed = parse_llm_json_output(response_text) if cache_dir or parse_json else None
+        # Only well-formed responses are cached so failed parses are retried next run
+        if cache_dir and parsed is not None:
+            save_cached_llm_response(cache_dir, prompt, response_text, cache_namespace)
+        return parsed if parse_json else response_text
+
+    unique_outputs = await asyncio.gather(*(complete(prompt) for prompt in unique_prompts), return_exceptions=True)
+    if len(unique_prompts) == len(prompts):
+        return unique_outputs
+    output_by_prompt = dict(zip(unique_prompts, unique_outputs))
+    return [output_by_prompt[prompt] for prompt in prompts]
+
+
+def _get_document_source_path(doc: Document) -> str:
+    """Return the document source path (virtual path for archive members)"""
+    return doc.extra_info.get('virtual_path',
+                              doc.extra_info.get('source_path',
+                                                 doc.extra_info.get('file_name', 'unknown')))
 
 
 def _calculate_document_hash(text: str, source_path: str) -> str:
     """
     Calculate document hash using SHA-256
     
+    The digest is that of "{text}:{source_path}", fed to the hasher in parts so
+    the text is not copied into a concatenated string first. SHA-256 is kept
+    (not a faster non-cryptographic digest) so hashes stay comparable with the
+    processed files database.
+    
     Args:
         text: Document text content
         source_path: Source path (including virtual paths)
@@ -307,16 +677,61 @@ def _calculate_document_hash(text: str, source_path: str) -> str:
     Returns:
         str: SHA-256 hash string
     """
-    combined = f"{text}:{source_path}"
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+    hasher = hashlib.sha256(text.encode('utf-8'), usedforsecurity=False)
+    hasher.update(b':')
+    hasher.update(source_path.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _get_document_physical_path(doc: Document) -> str:
+    """Return the path of the file on disk the document was loaded from (the archive for archive members)"""
+    return (doc.extra_info.get('source_archive')
+            or doc.extra_info.get('source_path')
+            or doc.extra_info.get('file_path'))
+
+
+def _hash_documents_serial(items: List[tuple]) -> List[str]:
+    return [_calculate_document_hash(text, source_path) for text, source_path in items]
 
 
-def _create_archive_filesystem(archive_path: str) -> 'fsspec.AbstractFileSystem':
+def _hash_documents(documents: List[Document], source_paths: List[str], max_workers: int = None) -> List[str]:
+    """
+    Calculate document hashes in batches across a thread pool
+    
+    Documents are hashed in one contiguous batch per worker rather than one
+    task per document, so corpora with many small documents (e.g. CSV rows)
+    do not pay a scheduling round-trip per hash. hashlib releases the GIL on
+    large buffers, letting batches run concurrently.
+    
+    Args:
+        documents: Documents to hash
+        source_paths: Source path of each document
+        max_workers: Number of threads (defaults to os.cpu_count())
+        
+    Returns:
+        List[str]: SHA-256 hash of each document, in input order
+    """
+    items = [(doc.text, source_path) for doc, source_path in zip(documents, source_paths)]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or len(items) < 4:
+        return _hash_documents_serial(items)
+
+    batch_size = -(-len(items) // max_workers)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    doc_hashes = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch_hashes in executor.map(_hash_documents_serial, batches):
+            doc_hashes.extend(batch_hashes)
+    return doc_hashes
+
+
+def _create_archive_filesystem(archive_path: str, fo=None) -> 'fsspec.AbstractFileSystem':
     """
     Create filesystem for archive file
     
     Args:
         archive_path: Path to archive file
+        fo: Already opened binary file of the archive (opened from archive_path when omitted)
         
     Returns:
         fsspec.AbstractFileSystem: Filesystem for the archive
@@ -324,14 +739,20 @@ def _create_archive_filesystem(archive_path: str) -> 'fsspec.AbstractFileSystem'
     Raises:
         ValueError: If archive format is not supported
     """
-    file_ext = Path(archive_path).suffix.lower()
-    
-    if file_ext == '.zip':
-        return fsspec.filesystem('zip', fo=archive_path)
-    elif file_ext in ['.tar', '.tar.gz', '.tgz', '.tar.bz2']:
-        return fsspec.filesystem('tar', fo=archive_path)
-    else:
-        raise ValueError(f"Unsupported archive format: {file_ext} for {archive_path}")
+    protocol = _archive_protocol(archive_path)
+    if protocol is None:
+        raise ValueError(f"Unsupported archive format: {Path(archive_path).suffix.lower()} for {archive_path}")
+    return fsspec.filesystem(protocol, fo=fo or archive_path)
+
+
+def _archive_protocol(archive_path: str) -> str:
+    """Return the fsspec protocol that reads an archive, or None if its format is not supported"""
+    # Path.suffix would only see ".gz" / ".bz2" of ".tar.gz" / ".tar.bz2", so match whole extensions
+    lower_path = archive_path.lower()
+    for file_ext, protocol in _ARCHIVE_PROTOCOLS.items():
+        if lower_path.endswith(file_ext):
+            return protocol
+    return None
 
 
 def _find_archive_files(input_dir: str, file_filter: FileFilter = None) -> List[str]:
@@ -358,7 +779,9 @@ def _load_documents_with_archives(
     recursive: bool = True,
     show_progress: bool = False,
     file_filter: FileFilter = None,
-    use_archive_reader: bool = True
+    use_archive_reader: bool = True,
+    max_workers: int = None,
+    processed_fingerprints: frozenset = None
 ) -> List[Document]:
     """
     Load documents with unified processing logic
@@ -370,6 +793,8 @@ def _load_documents_with_archives(
         show_progress: Whether to show progress
         file_filter: FileFilter instance for filtering files
         use_archive_reader: Whether to process archive files
+        max_workers: Number of threads used to read files and archives (defaults to os.cpu_count())
+        processed_fingerprints: Stat fingerprints of already processed files, which are skipped
         
     Returns:
         List[Document]: Loaded documents
@@ -381,13 +806,18 @@ def _load_documents_with_archives(
         file_filter = FileFilter()
     
     # Process regular files
-    all_docs.extend(_process_regular_files(input_dir, file_extractor, recursive, show_progress, file_filter))
+    all_docs.extend(_process_regular_files(input_dir, file_extractor, recursive, show_progress, file_filter, max_workers, processed_fingerprints))
     
     # Process archive files only if enabled
     if use_archive_reader:
-        archive_files = _find_archive_files(input_dir, file_filter)
-        for archive_path in archive_files:
-            all_docs.extend(_process_archive_files(archive_path, file_extractor, show_progress, file_filter))
+        archive_files = _skip_unchanged_files(_find_archive_files(input_dir, file_filter), processed_fingerprints)
+        # Each archive has its own file handle and filesystem, so archives are read concurrently
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            for archive_docs in executor.map(
+                lambda archive_path: _process_archive_files(archive_path, file_extractor, show_progress, file_filter),
+                archive_files,
+            ):
+                all_docs.extend(archive_docs)
     
     return all_docs
 
@@ -397,50 +827,129 @@ def _process_regular_files(
     file_extractor: Dict[str, Any],
     recursive: bool,
     show_progress: bool,
-    file_filter: FileFilter
+    file_filter: FileFilter,
+    max_workers: int = None,
+    processed_fingerprints: frozenset = None
 ) -> List[Document]:
-    """Process regular files with CSV special handling"""
+    """Process regular files with CSV special handling, reading files in a thread pool"""
     all_docs = []
     
-    # Find all files
-    all_file_paths = []
-    if recursive:
-        for root, _, files in os.walk(input_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                all_file_paths.append(file_path)
-    else:
-        for file in os.listdir(input_dir):
-            file_path = os.path.join(input_dir, file)
-            if os.path.isfile(file_path):
-                all_file_paths.append(file_path)
+    # Find all files, keeping each scandir entry so only files that pass the filter are stat'ed
+    file_entries = dict(_scan_files(input_dir, recursive))
     
     # Filter files
-    all_file_paths = file_filter.filter_file_paths(all_file_paths)
+    all_file_paths = file_filter.filter_file_paths(list(file_entries))
+    all_file_paths = _skip_unchanged_files(all_file_paths, processed_fingerprints, file_entries)
     
-    # Separate CSV and non-CSV files
-    csv_files = [f for f in all_file_paths if f.endswith('.csv')]
-    non_csv_files = [f for f in all_file_paths if not f.endswith('.csv')]
+    csv_files, non_csv_files = _split_csv_paths(all_file_paths)
     
-    # Process CSV files with row-by-row logic
-    for csv_path in csv_files:
-        if show_progress:
-            print(f"Processing CSV file: {csv_path}")
-        all_docs.extend(_process_csv_file(csv_path))
-    
-    # Process non-CSV files with UnstructuredReader
-    if non_csv_files:
+    def load_non_csv_file(file_path: str) -> List[Document]:
         reader = SimpleDirectoryReader(
-            input_files=non_csv_files,
+            input_files=[file_path],
             file_extractor=file_extractor,
             recursive=False
         )
-        non_csv_docs = reader.load_data(show_progress=show_progress)
-        all_docs.extend(non_csv_docs)
+        return reader.load_data()
+
+    # File reads are I/O bound (and the parsers release the GIL for most of
+    # their work), so threads overlap them well. executor.map keeps the
+    # documents in input order.
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        # Both kinds are submitted up front so non-CSV reads do not wait for the last CSV file
+        csv_results = executor.map(_process_csv_file, csv_files)
+        non_csv_results = executor.map(load_non_csv_file, non_csv_files)
+
+        # Process CSV files with row-by-row logic
+        for csv_path, csv_docs in zip(csv_files, csv_results):
+            if show_progress:
+                print(f"Processed CSV file: {csv_path}")
+            all_docs.extend(csv_docs)
+
+        # Process non-CSV files with UnstructuredReader
+        for file_path, file_docs in zip(non_csv_files, non_csv_results):
+            if show_progress:
+                print(f"Loaded file: {file_path}")
+            all_docs.extend(file_docs)
     
     return all_docs
 
 
+def _split_csv_paths(file_paths: List[str]) -> tuple:
+    """Split paths into (CSV paths, non-CSV paths) in a single pass"""
+    csv_files = []
+    non_csv_files = []
+    for file_path in file_paths:
+        (csv_files if file_path.endswith(CSV_EXT) else non_csv_files).append(file_path)
+    return csv_files, non_csv_files
+
+
+def _scan_files(directory: str, recursive: bool = True):
+    """
+    Yield (path, os.DirEntry) for every file under directory using os.scandir
+    
+    Files are yielded in the same order as os.walk (top-down, a directory's
+    files before its subdirectories). Symlinked directories are not followed.
+    File types come from the directory listing; entries are only stat'ed
+    when their DirEntry.stat() is called (the result is cached on the entry).
+    """
+    subdirectories = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry.path, entry
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+    for subdirectory in subdirectories:
+        yield from _scan_files(subdirectory, recursive)
+
+
+def _skip_unchanged_files(file_paths: List[str], processed_fingerprints: frozenset = None, file_entries: Dict[str, os.DirEntry] = None) -> List[str]:
+    """Drop files whose stat fingerprint matches an already processed file"""
+    if not processed_fingerprints:
+        return file_paths
+    changed_file_paths = []
+    for file_path in file_paths:
+        entry = file_entries.get(file_path) if file_entries else None
+        if entry is None:
+            fingerprint = get_file_fingerprint(file_path)
+        else:
+            try:
+                fingerprint = fingerprint_from_stat(entry.stat())
+            except OSError:
+                fingerprint = None
+        if fingerprint in processed_fingerprints:
+            print(f"Skipping unchanged file: {file_path}")
+        else:
+            changed_file_paths.append(file_path)
+    return changed_file_paths
+
+
+def _parse_nodes_parallel(node_parser, documents: List[Document], max_workers: int = None) -> list:
+    """
+    Chunk documents into nodes in a thread pool
+    
+    Args:
+        node_parser: Node parser (e.g. SentenceSplitter)
+        documents: Documents to chunk
+        max_workers: Number of threads (defaults to os.cpu_count())
+        
+    Returns:
+        list: Nodes in document order
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or len(documents) <= 1:
+        return node_parser.get_nodes_from_documents(documents)
+
+    # One slice per worker keeps the per-call overhead low while preserving order
+    slice_size = -(-len(documents) // max_workers)
+    slices = [documents[i:i + slice_size] for i in range(0, len(documents), slice_size)]
+    nodes = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for slice_nodes in executor.map(node_parser.get_nodes_from_documents, slices):
+            nodes.extend(slice_nodes)
+    return nodes
+
+
 def _process_archive_files(
     archive_path: str,
     file_extractor: Dict[str, Any],
@@ -454,28 +963,39 @@ def _process_archive_files(
         print(f"Processing archive: {archive_path}")
     
     try:
-        archive_fs = _create_archive_filesystem(archive_path)
+        # Member reads go through a large buffer instead of the default 8 KiB one,
+        # so decompressing members does not issue a small read per compressed block
+        archive_file = open(archive_path, 'rb', buffering=ARCHIVE_READ_BUFFER_SIZE)
+    except OSError as e:
+        print(f"Error processing archive {archive_path}: {e}")
+        raise RuntimeError(f"Archive processing failed: {archive_path}") from e
+
+    try:
+        archive_fs = _create_archive_filesystem(archive_path, archive_file)
         
         # List all files in archive
         all_archive_files = archive_fs.find("", detail=False)
         
-        # Separate CSV and non-CSV files
-        csv_files = [f for f in all_archive_files if f.endswith('.csv')]
-        non_csv_files = [f for f in all_archive_files if not f.endswith('.csv')]
+        csv_files, non_csv_files = _split_csv_paths(all_archive_files)
         
-        # Process CSV files from archive
-        for csv_file in csv_files:
-            if show_progress:
-                print(f"Processing CSV from archive: {csv_file}")
-            all_docs.extend(_process_csv_from_archive(csv_file, archive_path, archive_fs))
+        # Process CSV files from archive. zipfile lets several members be read at
+        # once (decompression runs outside its file lock); tarfile does not.
+        member_workers = ARCHIVE_MEMBER_WORKERS if _archive_protocol(archive_path) == 'zip' else 1
+        with ThreadPoolExecutor(max_workers=member_workers) as executor:
+            csv_results = executor.map(lambda csv_file: _process_csv_from_archive(csv_file, archive_path, archive_fs), csv_files)
+            for csv_file, csv_docs in zip(csv_files, csv_results):
+                if show_progress:
+                    print(f"Processed CSV from archive: {csv_file}")
+                all_docs.extend(csv_docs)
         
         # Process non-CSV files from archive
         if non_csv_files:
             # Filter non-CSV files from archive
             filtered_non_csv_files = file_filter.filter_file_paths(non_csv_files)
             if filtered_non_csv_files:
+                # Only the filtered non-CSV members are read (CSV members were already split into rows)
                 archive_reader = SimpleDirectoryReader(
-                    input_dir="",
+                    input_files=filtered_non_csv_files,
                     fs=archive_fs,
                     file_extractor=file_extractor,
                     file_metadata=lambda fname: _create_archive_metadata(fname, archive_path)
@@ -489,24 +1009,105 @@ def _process_archive_files(
     except Exception as e:
         print(f"Error processing archive {archive_path}: {e}")
         raise RuntimeError(f"Archive processing failed: {archive_path}") from e
+    finally:
+        archive_file.close()
     
     return all_docs
 
+def _csv_row_texts(df: pd.DataFrame) -> List[str]:
+    """
+    Render each CSV row as "col1: val1, col2: val2, ..." using vectorized string operations
+    
+    Rows are rendered CSV_TEXT_BATCH_ROWS at a time, so the intermediate string
+    copies of large files are bounded by the batch rather than the whole file.
+    
+    Args:
+        df: CSV contents
+        
+    Returns:
+        List[str]: One text per row, in row order
+    """
+    if df.columns.empty:
+        return [""] * len(df)
+    prefixes = [f"{col}: " for col in df.columns]
+    texts = []
+    for start in range(0, len(df), CSV_TEXT_BATCH_ROWS):
+        str_df = df.iloc[start:start + CSV_TEXT_BATCH_ROWS].astype(str)
+        columns = [prefix + str_df.iloc[:, i] for i, prefix in enumerate(prefixes)]
+        if len(columns) == 1:
+            texts.extend(columns[0].tolist())
+        else:
+            texts.extend(columns[0].str.cat(columns[1:], sep=", ").tolist())
+    return texts
+
+
+def _read_csv(source) -> pd.DataFrame:
+    """
+    Read a CSV file with the multi-threaded pyarrow parser
+    
+    pyarrow rejects some inputs the C parser accepts (e.g. newlines inside
+    quoted values), and it parses ISO-8601 columns into timestamps that the C
+    parser keeps as written. Both cases are read again with the default C
+    parser, so row texts (and their document hashes) match what it produces.
+    Empty cells in string columns come back as None rather than NaN, so they
+    are replaced with NaN and render as "nan" like the C parser's.
+    
+    Args:
+        source: File path or binary file object
+        
+    Returns:
+        pd.DataFrame: CSV contents
+    """
+    try:
+        df = pd.read_csv(source, engine="pyarrow")
+        if not any(pd.api.types.is_datetime64_any_dtype(dtype) for dtype in df.dtypes):
+            object_columns = df.columns[df.dtypes == object]
+            if len(object_columns):
+                df[object_columns] = df[object_columns].where(df[object_columns].notna(), np.nan)
+            return df
+    except ValueError:
+        # ArrowInvalid and pandas' ParserError are both ValueErrors
+        pass
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return pd.read_csv(source)
+
+
+def _read_csv_rows(source) -> tuple:
+    """
+    Read a CSV file into (row indices, row texts)
+    
+    The DataFrame is released before the caller builds one Document per row, so
+    the parsed table and the documents are not held in memory at the same time.
+    
+    Args:
+        source: File path or binary file object
+        
+    Returns:
+        tuple: (list of row indices, list of row texts)
+    """
+    df = _read_csv(source)
+    return df.index.tolist(), _csv_row_texts(df)
+
+
 def _process_csv_file(csv_path: str) -> List[Document]:
     """Process CSV file with row-by-row document creation"""
     documents = []
     try:
-        df = pd.read_csv(csv_path)
-        for index, row in df.iterrows():
-            doc_content = ", ".join([f"{col}: {val}" for col, val in row.items()])
-            documents.append(Document(
+        row_indices, row_texts = _read_csv_rows(csv_path)
+        # Per-file metadata values are computed once and shared by every row's metadata
+        file_name = sys.intern(os.path.basename(csv_path))
+        documents = [
+            Document(
                 text=doc_content,
                 extra_info={
-                    "file_name": os.path.basename(csv_path),
+                    "file_name": file_name,
                     "row_index": index,
                     "source_path": csv_path
                 }
-            ))
+            )
+            for index, doc_content in zip(row_indices, row_texts)
+        ]
     except Exception as e:
         print(f"Error processing CSV file {csv_path}: {e}")
         raise RuntimeError(f"CSV processing failed: {csv_path}") from e
@@ -518,21 +1119,25 @@ def _process_csv_from_archive(csv_file: str, archive_path: str, archive_fs) -> L
     """Process CSV file from archive with row-by-row document creation"""
     documents = []
     try:
-        with archive_fs.open(csv_file, 'r') as f:
-            df = pd.read_csv(f)
-            for index, row in df.iterrows():
-                doc_content = ", ".join([f"{col}: {val}" for col, val in row.items()])
-                documents.append(Document(
-                    text=doc_content,
-                    extra_info={
-                        "file_name": os.path.basename(csv_file),
-                        "row_index": index,
-                        "source_archive": archive_path,
-                        "archive_internal_path": csv_file,
-                        "virtual_path": f"{archive_path}!/{csv_file}",
-                        "is_from_archive": True
-                    }
-                ))
+        with archive_fs.open(csv_file, 'rb') as f:
+            row_indices, row_texts = _read_csv_rows(f)
+        # Per-file metadata values are computed once and shared by every row's metadata
+        file_name = sys.intern(os.path.basename(csv_file))
+        virtual_path = f"{archive_path}!/{csv_file}"
+        documents = [
+            Document(
+                text=doc_content,
+                extra_info={
+                    "file_name": file_name,
+                    "row_index": index,
+                    "source_archive": archive_path,
+                    "archive_internal_path": csv_file,
+                    "virtual_path": virtual_path,
+                    "is_from_archive": True
+                }
+            )
+            for index, doc_content in zip(row_indices, row_texts)
+        ]
     except Exception as e:
         print(f"Error processing CSV from archive {csv_file}: {e}")
         raise RuntimeError(f"Archive CSV processing failed: {csv_file}") from e
@@ -7,6 +7,7 @@ from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 from llama_index.core import Settings
 from llama_index.core.vector_stores.types import VectorStore
 
+from ..vector_store_manager import get_project_filters
 from .context_builder import ContextBuilder
 from .global_searcher import GlobalSearcher
 from .local_searcher import LocalSearcher
@@ -37,14 +38,17 @@ class DriftSearchEngine:
         self.vector_stores = vector_stores
         self.llm = llm or Settings.llm
         
-        # Initialize components
+        # Initialize components (vector queries are restricted to this project when enabled)
+        filters = get_project_filters(config)
         self.local_searcher = LocalSearcher(
             vector_stores=vector_stores,
             config=self.config.get("local_search", {}),
+            filters=filters,
         )
         self.global_searcher = GlobalSearcher(
             vector_stores=vector_stores,
             config=self.config.get("global_search", {}),
+            filters=filters,
         )
         self.context_builder = ContextBuilder(
             config=self.config.get("context", {}),
@@ -61,6 +65,7 @@ class DriftSearchEngine:
         query: str,
         streaming: bool = False,
         include_context: bool = True,
+        raise_errors: bool = False,
     ) -> Union[str, AsyncGenerator[str, None], Tuple[str, Dict[str, Any]]]:
         """
         Execute DRIFT search.
@@ -69,19 +74,22 @@ class DriftSearchEngine:
             query: Search query
             streaming: Enable streaming response
             include_context: Include context data in response
+            raise_errors: Raise search and generation errors instead of returning
+                them as response text (lets callers tell failures from answers)
             
         Returns:
             Search response (string, async generator, or tuple with context)
         """
         if streaming:
-            return self._search_streaming(query, include_context)
+            return self._search_streaming(query, include_context, raise_errors)
         else:
-            return await self._search_non_streaming(query, include_context)
+            return await self._search_non_streaming(query, include_context, raise_errors)
     
     async def _search_non_streaming(
         self,
         query: str,
         include_context: bool,
+        raise_errors: bool = False,
     ) -> Union[str, Tuple[str, Dict[str, Any]]]:
         """Non-streaming search implementation."""
         try:
@@ -119,7 +127,7 @@ class DriftSearchEngine:
             context = context.trim_to_token_limit(max_tokens)
             
             # Generate response
-            response = await self.response_generator.generate_response(context)
+            response = await self.response_generator.generate_response(context, raise_errors=raise_errors)
             
             if include_context:
                 return response, context.to_dict()
@@ -128,6 +136,8 @@ class DriftSearchEngine:
                 
         except Exception as e:
             logger.error(f"Error during DRIFT search: {e}", exc_info=True)
+            if raise_errors:
+                raise
             error_msg = f"DRIFT search failed: {str(e)}"
             
             if include_context:
@@ -139,6 +149,7 @@ class DriftSearchEngine:
         self,
         query: str,
         include_context: bool,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[str, None]:
         """Streaming search implementation."""
         try:
@@ -180,11 +191,13 @@ class DriftSearchEngine:
                 self._last_context = context.to_dict()
             
             # Stream response
-            async for chunk in self.response_generator.stream_response(context):
+            async for chunk in self.response_generator.stream_response(context, raise_errors=raise_errors):
                 yield chunk
                 
         except Exception as e:
             logger.error(f"Error during DRIFT search: {e}", exc_info=True)
+            if raise_errors:
+                raise
             yield f"DRIFT search failed: {str(e)}"
     
     def get_last_context(self) -> Optional[Dict[str, Any]]:
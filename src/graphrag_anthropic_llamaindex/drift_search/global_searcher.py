@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-from llama_index.core.vector_stores.types import VectorStore, VectorStoreQuery, VectorStoreQueryMode
+from llama_index.core.vector_stores.types import MetadataFilters, VectorStore, VectorStoreQuery, VectorStoreQueryMode
 
 from ..db_manager import load_community_summaries_db
 from .models import Community
@@ -19,6 +19,7 @@ class GlobalSearcher:
         self,
         vector_stores: Dict[str, VectorStore],
         config: Optional[Dict[str, Any]] = None,
+        filters: Optional[MetadataFilters] = None,
     ):
         """
         Initialize global searcher.
@@ -26,9 +27,11 @@ class GlobalSearcher:
         Args:
             vector_stores: Mapping of vector store names to instances
             config: Global search configuration
+            filters: Metadata filters applied to every vector store query
         """
         self.community_store = vector_stores.get("community")
         self.config = config or {}
+        self.filters = filters
         
         # Configuration
         self.community_top_k = self.config.get("community_top_k", 5)
@@ -67,6 +70,7 @@ class GlobalSearcher:
                 query_str=query,
                 mode=VectorStoreQueryMode.DEFAULT,
                 similarity_top_k=top_k,
+                filters=self.filters,
             )
             
             # Search community store
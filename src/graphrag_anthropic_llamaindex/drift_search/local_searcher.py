@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict, List, Optional, Set
 
 import pandas as pd
-from llama_index.core.vector_stores.types import VectorStore, VectorStoreQuery, VectorStoreQueryMode
+from llama_index.core.vector_stores.types import MetadataFilters, VectorStore, VectorStoreQuery, VectorStoreQueryMode
 
 from ..db_manager import load_entities_db, load_relationships_db
 from .models import Entity, TextUnit
@@ -19,6 +19,7 @@ class LocalSearcher:
         self,
         vector_stores: Dict[str, VectorStore],
         config: Optional[Dict[str, Any]] = None,
+        filters: Optional[MetadataFilters] = None,
     ):
         """
         Initialize local searcher.
@@ -26,10 +27,12 @@ class LocalSearcher:
         Args:
             vector_stores: Mapping of vector store names to instances
             config: Local search configuration
+            filters: Metadata filters applied to every vector store query
         """
         self.entity_store = vector_stores.get("entity")
         self.main_store = vector_stores.get("main")
         self.config = config or {}
+        self.filters = filters
         
         # Configuration
         self.entity_top_k = self.config.get("entity_top_k", 10)
@@ -70,6 +73,7 @@ class LocalSearcher:
                 query_str=query,
                 mode=VectorStoreQueryMode.DEFAULT,
                 similarity_top_k=top_k,
+                filters=self.filters,
             )
             
             # Search entity store
@@ -149,11 +153,9 @@ class LocalSearcher:
                     (self._relationships_cache["target"] == entity.id)
                 ]
                 
-                for _, rel in related_df.iterrows():
+                for source, target in zip(related_df["source"], related_df["target"]):
                     # Get the other entity in the relationship
-                    other_id = (
-                        rel["target"] if rel["source"] == entity.id else rel["source"]
-                    )
+                    other_id = target if source == entity.id else source
                     
                     if other_id not in visited:
                         visited.add(other_id)
@@ -220,6 +222,7 @@ class LocalSearcher:
                     query_str=name,
                     mode=VectorStoreQueryMode.DEFAULT,
                     similarity_top_k=top_k // len(entity_names) + 1,
+                    filters=self.filters,
                 )
                 
                 result = self.main_store.query(query_obj)
@@ -72,12 +72,14 @@ class ResponseGenerator:
     async def generate_response(
         self,
         context: SearchContext,
+        raise_errors: bool = False,
     ) -> str:
         """
         Generate response from search context.
         
         Args:
             context: Search context
+            raise_errors: Re-raise LLM errors instead of returning an error message as the response
             
         Returns:
             Generated response
@@ -118,24 +120,28 @@ class ResponseGenerator:
             
         except Exception as e:
             logger.error(f"Error generating response: {e}", exc_info=True)
+            if raise_errors:
+                raise
             return f"Ошибка при генерации ответа: {str(e)}"
     
     async def stream_response(
         self,
         context: SearchContext,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[str, None]:
         """
         Stream response generation.
         
         Args:
             context: Search context
+            raise_errors: Re-raise LLM errors instead of yielding an error message as the last chunk
             
         Yields:
             Response chunks
         """
         if not self.streaming_enabled:
             # Fall back to non-streaming
-            response = await self.generate_response(context)
+            response = await self.generate_response(context, raise_errors=raise_errors)
             yield response
             return
         
@@ -185,6 +191,8 @@ class ResponseGenerator:
                 
         except Exception as e:
             logger.error(f"Error streaming response: {e}", exc_info=True)
+            if raise_errors:
+                raise
             yield f"Ошибка при потоковой генерации: {str(e)}"
     
     def create_summary_response(
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+DEFAULT_EMBEDDING_CACHE_SIZE = 1024
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper that memoizes query embeddings.
+
+    Query embeddings are cached in an LRU keyed by a BLAKE2b digest of the
+    query text, so a repeated query (e.g. resent after a connection error,
+    or embedded once for the semantic cache and again by the retriever)
+    skips the tokenizer and model forward pass. Text (document) embeddings
+    are passed through to the wrapped model unchanged.
+    """
+
+    inner: BaseEmbedding = Field(description="Wrapped embedding model.")
+    cache_size: int = Field(default=DEFAULT_EMBEDDING_CACHE_SIZE, description="Maximum number of cached query embeddings.")
+
+    _cache: "OrderedDict[bytes, Embedding]" = PrivateAttr(default_factory=OrderedDict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, inner: BaseEmbedding, cache_size: int = DEFAULT_EMBEDDING_CACHE_SIZE, **kwargs: Any):
+        """
+        Initialize CachedEmbedding.
+
+        Args:
+            inner: Embedding model to wrap
+            cache_size: Maximum number of cached query embeddings
+        """
+        kwargs.setdefault("model_name", inner.model_name)
+        kwargs.setdefault("embed_batch_size", inner.embed_batch_size)
+        super().__init__(inner=inner, cache_size=cache_size, **kwargs)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @staticmethod
+    def _cache_key(query: str) -> bytes:
+        return hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest()
+
+    def _lookup(self, key: bytes):
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+            return embedding
+
+    def _store(self, key: bytes, embedding: Embedding) -> None:
+        with self._lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Remove all cached query embeddings."""
+        with self._lock:
+            self._cache.clear()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        key = self._cache_key(query)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self.inner._get_query_embedding(query)
+            self._store(key, embedding)
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        key = self._cache_key(query)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = await self.inner._aget_query_embedding(query)
+            self._store(key, embedding)
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self.inner._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await self.inner._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self.inner._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self.inner._aget_text_embeddings(texts)
@@ -0,0 +1,58 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_MODEL_NAME = "intfloat/multilingual-e5-small"
+DEFAULT_EMBED_BATCH_SIZE = 64
+SUPPORTED_EMBED_DTYPES = ("fp32", "fp16", "int8")
+
+
+def create_embedding_model(embedding_config=None):
+    """Creates the HuggingFace embedding model from the `embedding_model` config section.
+
+    Supported keys:
+        name: HuggingFace model name
+        embed_batch_size: Number of texts embedded per forward pass
+        dtype: "fp32" (default), "fp16" (CUDA only) or "int8" (CPU dynamic quantization)
+
+    Reduced precision halves (fp16) or quarters (int8) the memory traffic of
+    the forward pass. Unsupported combinations fall back to fp32 with a warning.
+    """
+    import torch
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    embedding_config = embedding_config or {}
+    model_name = embedding_config.get("name", DEFAULT_EMBED_MODEL_NAME)
+    embed_batch_size = embedding_config.get("embed_batch_size", DEFAULT_EMBED_BATCH_SIZE)
+    dtype = embedding_config.get("dtype", "fp32")
+    if dtype not in SUPPORTED_EMBED_DTYPES:
+        logger.warning(f"Unsupported embedding dtype '{dtype}', falling back to fp32")
+        dtype = "fp32"
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model_kwargs = {}
+    if dtype == "fp16":
+        if device == "cuda":
+            model_kwargs["torch_dtype"] = torch.float16
+        else:
+            logger.warning("fp16 embeddings require CUDA, falling back to fp32")
+            dtype = "fp32"
+    elif dtype == "int8" and device != "cpu":
+        logger.warning("int8 embeddings are only supported on CPU, falling back to fp32")
+        dtype = "fp32"
+
+    embed_model = HuggingFaceEmbedding(
+        model_name=model_name,
+        embed_batch_size=embed_batch_size,
+        device=device,
+        model_kwargs=model_kwargs,
+    )
+
+    if dtype == "int8":
+        # Dynamic INT8 quantization of the Linear layers (weights quantized once, activations per batch)
+        torch.quantization.quantize_dynamic(
+            embed_model._model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+    logger.info(f"Loaded embedding model: {model_name} (device={device}, dtype={dtype}, batch_size={embed_batch_size})")
+    return embed_model
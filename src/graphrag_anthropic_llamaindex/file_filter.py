@@ -1,7 +1,6 @@
 import fnmatch
 import os
 from typing import List, Optional
-from pathlib import Path
 from llama_index.core.schema import Document
 
 
@@ -99,6 +98,8 @@ class FileFilter:
             List[str]: List of file paths that match criteria and are not ignored
         """
         file_paths = []
+        # Matched with endswith so multi-part extensions such as '.tar.gz' work (Path.suffix only sees '.gz')
+        extension_suffixes = tuple(ext.lower() for ext in extensions) if extensions else None
         
         if recursive:
             for root, _, files in os.walk(input_dir):
@@ -106,7 +107,7 @@ class FileFilter:
                     file_path = os.path.join(root, file)
                     
                     # Check extension if specified
-                    if extensions and Path(file).suffix.lower() not in extensions:
+                    if extension_suffixes and not file.lower().endswith(extension_suffixes):
                         continue
                     
                     # Check ignore patterns
@@ -122,7 +123,7 @@ class FileFilter:
                     continue
                 
                 # Check extension if specified
-                if extensions and Path(file).suffix.lower() not in extensions:
+                if extension_suffixes and not file.lower().endswith(extension_suffixes):
                     continue
                 
                 # Check ignore patterns
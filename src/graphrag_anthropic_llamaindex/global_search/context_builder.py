@@ -7,7 +7,7 @@ from typing import List, Dict, Any, Optional
 import random
 import pandas as pd
 
-from ..vector_store_manager import get_vector_store, get_index
+from ..vector_store_manager import get_vector_store, get_index, get_project_filters
 
 logger = logging.getLogger(__name__)
 
@@ -117,7 +117,8 @@ class CommunityContextBuilder:
             
             # クエリエンジンを作成
             query_engine = index.as_query_engine(
-                similarity_top_k=50  # 上位50件のコミュニティレポートを取得
+                similarity_top_k=50,  # 上位50件のコミュニティレポートを取得
+                filters=get_project_filters(self.config)  # 類似度計算の前にプロジェクトで絞り込む
             )
             
             # 検索実行
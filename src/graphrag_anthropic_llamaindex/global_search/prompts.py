@@ -4,6 +4,8 @@ GLOBAL検索用のプロンプトテンプレート
 MS-GraphRAGのMap-Reduceパターンに基づくプロンプト定義
 """
 
+from functools import lru_cache
+
 # Map処理用のシステムプロンプト
 MAP_SYSTEM_PROMPT = """
 ---役割---
@@ -125,4 +127,19 @@ Please synthesize the analyst reports into a comprehensive answer to the user's
 """
 
 # データなしの場合の回答
-NO_DATA_ANSWER = "申し訳ありませんが、提供されたデータではこの質問に答えることができません。"
\ No newline at end of file
+NO_DATA_ANSWER = "申し訳ありませんが、提供されたデータではこの質問に答えることができません。"
+
+
+@lru_cache(maxsize=16)
+def get_reduce_system_prompt_template(response_type: str, max_length: int) -> str:
+    """
+    response_typeと最大語数を事前に展開したReduceシステムプロンプトを取得
+    
+    クエリごとに変わる {report_data} のみ未展開のまま残す。
+    展開済みの値を再度format()に通さないよう、呼び出し側はstr.replaceで埋め込むこと。
+    """
+    return REDUCE_SYSTEM_PROMPT.format(
+        max_length=max_length,
+        response_type=response_type,
+        report_data="{report_data}"
+    )
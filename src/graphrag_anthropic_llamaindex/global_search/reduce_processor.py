@@ -11,7 +11,7 @@ from llama_index.llms.anthropic import Anthropic
 from llama_index.llms.bedrock import Bedrock
 
 from .models import MapResult, KeyPoint, GlobalSearchResult, TraceabilityInfo
-from .prompts import REDUCE_SYSTEM_PROMPT, REDUCE_USER_PROMPT
+from .prompts import REDUCE_USER_PROMPT, get_reduce_system_prompt_template
 
 logger = logging.getLogger(__name__)
 
@@ -88,11 +88,9 @@ class ReduceProcessor:
         context = self._build_reduce_context(top_key_points)
         
         # システムプロンプトを構築
-        system_prompt = REDUCE_SYSTEM_PROMPT.format(
-            max_length=self.max_response_length,
-            response_type=self.response_type,
-            report_data=context
-        )
+        system_prompt = get_reduce_system_prompt_template(
+            self.response_type, self.max_response_length
+        ).replace("{report_data}", context)
         
         # ユーザープロンプトを構築
         user_prompt = REDUCE_USER_PROMPT.format(
@@ -246,16 +246,17 @@ class SearchModeRouter(BaseRetriever):
     
     def _execute_local_search(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
         """Local検索を実行"""
-        from ..local_search.retriever import LocalSearchRetriever
-        
         try:
-            # LocalSearchRetrieverのインスタンスを作成
-            local_retriever = LocalSearchRetriever(
-                config=self.config,
-                prompt_style="default",
-                top_k_entities=10,
-                max_context_tokens=4000
-            )
+            # 初期化済みのLocalSearchRetrieverを再利用（エンティティインデックスの再オープンを避ける）
+            local_retriever = self.local_retriever
+            if local_retriever is None:
+                from ..local_search.retriever import LocalSearchRetriever
+                local_retriever = LocalSearchRetriever(
+                    config=self.config,
+                    prompt_style="default",
+                    top_k_entities=10,
+                    max_context_tokens=4000
+                )
             
             # 検索を実行
             results = local_retriever.retrieve(query_bundle)
@@ -33,13 +33,11 @@ def _compute_leiden_communities(
     node_to_int = {node: i for i, node in enumerate(original_nodes)}
     int_to_node = {i: node for i, node in enumerate(original_nodes)}
     
-    # Create a new graph with integer node names
+    # Create a new graph with integer node names, added in bulk in the same order
+    # as the original graph so the seeded clustering is unchanged
     int_graph = nx.Graph()
-    for node in original_nodes:
-        int_graph.add_node(node_to_int[node])
-    
-    for edge in graph.edges():
-        int_graph.add_edge(node_to_int[edge[0]], node_to_int[edge[1]])
+    int_graph.add_nodes_from(range(len(original_nodes)))
+    int_graph.add_edges_from((node_to_int[u], node_to_int[v]) for u, v in graph.edges())
 
     # Use graspologic's hierarchical leiden algorithm
     hierarchical_clusters = hierarchical_leiden(
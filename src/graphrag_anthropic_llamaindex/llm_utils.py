@@ -1,32 +1,129 @@
+import asyncio
+import hashlib
 import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from llama_index.core import Settings
 
+try:
+    # orjson is optional (perf extra); its decode errors subclass json.JSONDecodeError
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Transient LLM errors are retried after an exponentially growing, jittered delay (e.g. on rate limits)
+LLM_RETRY_BASE_DELAY = 1.0
+LLM_RETRY_MAX_DELAY = 30.0
+
+def _retry_delay(attempt):
+    """Returns the delay in seconds before retrying a failed LLM call (attempt starts at 1)."""
+    delay = min(LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1), LLM_RETRY_MAX_DELAY)
+    # Jitter keeps concurrent requests that failed together from retrying in lockstep
+    return delay * random.uniform(0.5, 1.0)
+
+# HTTP statuses worth retrying: timeout, rate limit, server errors and Anthropic's 529 "overloaded"
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+# Bedrock (botocore ClientError) error codes worth retrying
+_RETRYABLE_AWS_ERROR_CODES = frozenset({
+    "ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException",
+    "InternalServerException", "ModelNotReadyException", "ModelTimeoutException",
+})
+
+@lru_cache(maxsize=None)
+def _transient_error_types():
+    """Returns the timeout/connection exception types of the installed LLM client libraries."""
+    error_types = [TimeoutError, ConnectionError, asyncio.TimeoutError]
+    try:
+        from anthropic import APIConnectionError  # Includes APITimeoutError
+        error_types.append(APIConnectionError)
+    except ImportError:
+        pass
+    try:
+        from httpx import TransportError
+        error_types.append(TransportError)
+    except ImportError:
+        pass
+    try:
+        from botocore.exceptions import HTTPClientError  # Read timeouts, connection errors
+        error_types.append(HTTPClientError)
+    except ImportError:
+        pass
+    return tuple(error_types)
+
+def _is_retryable_error(error):
+    """Returns True for transient LLM errors (rate limit, overload, timeout, connection).
+
+    Anything else (authentication, bad requests, NotImplementedError, bugs) fails
+    the same way on every attempt, so it is raised without backing off.
+    """
+    if isinstance(error, _transient_error_types()):
+        return True
+    if getattr(error, 'status_code', None) in _RETRYABLE_STATUS_CODES:
+        return True
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):  # botocore ClientError
+        return response.get('Error', {}).get('Code') in _RETRYABLE_AWS_ERROR_CODES
+    return False
+
 def _stitch_responses(s1, s2):
     if not s1:
         return s2
     if not s2:
         return s1
-    # Match up to 200 characters from the end of s1 with the start of s2
-    search_window = 200
-    max_overlap = 0
-    for k in range(min(len(s1), len(s2), search_window), 0, -1):
-        if s1.endswith(s2[:k]):
-            max_overlap = k
-            break
-    return s1 + s2[max_overlap:]
+    # Match up to 200 characters from the end of s1 with the start of s2.
+    # An overlap can only start where the tail contains s2's first character, so
+    # str.find jumps between those candidates; the leftmost match is the longest.
+    search_window = min(len(s1), len(s2), 200)
+    tail = s1[-search_window:]
+    pos = tail.find(s2[0])
+    while pos != -1:
+        if s2.startswith(tail[pos:]):
+            return s1 + s2[search_window - pos:]
+        pos = tail.find(s2[0], pos + 1)
+    return s1 + s2
 
-def _get_full_llm_response_with_continuation(original_prompt, max_continuation_attempts=5):
+def _build_continuation_prompt(original_prompt, full_response_text):
+    # Construct the continuation prompt: original prompt + current full response + continuation instruction
+    return (
+        f"{original_prompt}\n\n"
+        f"これまでの応答はトークン制限により途中で終了しました。続きを生成してください。\n"
+        f"これまでの応答:\n```\n{full_response_text}\n```\n"
+        f"続きを生成してください。"
+    )
+
+def _run_coroutine(coro):
+    """
+    Runs a coroutine to completion from synchronous code.
+    asyncio.run cannot be used while an event loop is already running in this
+    thread (e.g. when called from Jupyter or an async app), so in that case the
+    coroutine gets its own loop on a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def _continuation_steps(original_prompt, max_continuation_attempts):
     """
     Handles LLM calls with continuation logic for token limits.
     It repeatedly calls the LLM with a continuation prompt that includes the original prompt
-    and the already generated partial response, stitching the parts together while removing overlaps.
-    Includes a safeguard for infinite loops with max_continuation_attempts.
+    and the already generated partial response, stitching the parts together while removing overlaps,
+    until the response parses as JSON or max_continuation_attempts is reached.
+    Transient errors are retried after a backoff delay; other errors are raised immediately.
+
+    The loop is written once for the sync and async callers: it yields the next prompt to
+    complete (or a float, the seconds to wait before retrying), the caller sends back the LLM
+    response or throws the exception the call raised, and the generator returns the full text.
     """
-    
-    # LLM設定の確認
     if Settings.llm is None:
         raise ValueError("LLMが設定されていません。Settings.llmを設定してください。")
-    
+
     full_response_text = ""
     attempts = 0
     json_parse_successful = False
@@ -35,45 +132,19 @@ def _get_full_llm_response_with_continuation(original_prompt, max_continuation_a
         attempts += 1
         current_prompt = original_prompt
         if attempts > 1:
-            # Construct the continuation prompt: original prompt + current full response + continuation instruction
-            current_prompt = (
-                f"{original_prompt}\n\n"
-                f"これまでの応答はトークン制限により途中で終了しました。続きを生成してください。\n"
-                f"これまでの応答:\n```\n{full_response_text}\n```\n"
-                f"続きを生成してください。"
-            )
-        
+            current_prompt = _build_continuation_prompt(original_prompt, full_response_text)
+
         try:
-            response = Settings.llm.complete(current_prompt)
+            response = yield current_prompt
         except Exception as e:
             print(f"LLM呼び出しエラー (試行 {attempts}/{max_continuation_attempts}): {e}")
-            if attempts == max_continuation_attempts:
-                raise e
+            if attempts == max_continuation_attempts or not _is_retryable_error(e):
+                raise
+            yield _retry_delay(attempts)
             continue
-        next_part = response.text
-        
-        full_response_text = _stitch_responses(full_response_text, next_part)
-        
-        # Check if the current full_response_text is valid JSON
-        parsed_json = parse_llm_json_output(full_response_text)
-        json_parse_successful = (parsed_json is not None)
-        
-        # Also check for explicit truncation reason from LLM
-        is_explicitly_truncated = False
-        if hasattr(response, 'raw') and response.raw:
-            is_explicitly_truncated = response.raw.get("stop_reason") == "max_tokens"
-        
-        # If JSON parsing failed AND it's not explicitly truncated, it means the LLM stopped for another reason
-        # or produced malformed JSON. We continue if it's explicitly truncated OR if JSON parsing failed.
-        if not json_parse_successful and not is_explicitly_truncated:
-            # If JSON parsing failed but LLM didn't say max_tokens, it might be a malformed JSON issue
-            # that continuation won't fix, or a different stop reason. For now, we'll assume it needs continuation.
-            # However, to prevent infinite loops on consistently malformed JSON, max_attempts is crucial.
-            pass # The loop condition already handles attempts < max_continuation_attempts
-        
-        # The loop continues if JSON is not successful OR if it was explicitly truncated
-        # and we haven't reached max attempts.
-        # The condition `not json_parse_successful` is the primary driver for continuation now.
+
+        full_response_text = _stitch_responses(full_response_text, response.text)
+        json_parse_successful = parse_llm_json_output(full_response_text) is not None
 
     if not json_parse_successful:
         print(f"Warning: JSON parsing failed after {attempts} attempts. Response might be incomplete or malformed.")
@@ -82,6 +153,101 @@ def _get_full_llm_response_with_continuation(original_prompt, max_continuation_a
 
     return full_response_text
 
+def _get_full_llm_response_with_continuation(original_prompt, max_continuation_attempts=5):
+    """
+    Synchronous LLM call with continuation (see _continuation_steps).
+    Calls Settings.llm.complete directly, so no event loop is created per call.
+    """
+    steps = _continuation_steps(original_prompt, max_continuation_attempts)
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, float):
+                time.sleep(step)
+                step = steps.send(None)
+                continue
+            try:
+                response = Settings.llm.complete(step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(response)
+    except StopIteration as done:
+        return done.value
+
+async def _acomplete(prompt):
+    try:
+        return await Settings.llm.acomplete(prompt)
+    except NotImplementedError:
+        # Some LLM integrations (e.g. legacy Bedrock) only implement the sync API
+        return await asyncio.to_thread(Settings.llm.complete, prompt)
+
+async def _aget_full_llm_response_with_continuation(original_prompt, max_continuation_attempts=5):
+    """
+    Asynchronous LLM call with continuation (see _continuation_steps).
+    Being async, it lets callers keep many LLM calls in flight (e.g. with asyncio.gather and a semaphore).
+    """
+    steps = _continuation_steps(original_prompt, max_continuation_attempts)
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, float):
+                await asyncio.sleep(step)
+                step = steps.send(None)
+                continue
+            try:
+                response = await _acomplete(step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(response)
+    except StopIteration as done:
+        return done.value
+
+def llm_cache_namespace():
+    """
+    Returns a string identifying the configured LLM (class, model and temperature).
+    It is mixed into cache keys so switching models or sampling settings does not
+    reuse responses generated by a different configuration.
+    """
+    try:
+        llm = Settings.llm
+    except Exception:
+        return ""
+    model = getattr(llm, 'model', None) or getattr(llm, 'model_name', None)
+    return f"{type(llm).__name__}:{model}:{getattr(llm, 'temperature', None)}"
+
+def _llm_cache_path(cache_dir, prompt, namespace=""):
+    key = hashlib.sha256(f"{namespace}\0{prompt}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key[:2], key + '.json')
+
+def load_cached_llm_response(cache_dir, prompt, namespace=""):
+    """
+    Returns the cached LLM response text for a prompt, or None on a cache miss.
+    Entries are content-addressed by the SHA-256 of the namespace (see
+    llm_cache_namespace) and the full prompt, so a change to the model, the
+    prompt template or the input text is a miss.
+    """
+    try:
+        with open(_llm_cache_path(cache_dir, prompt, namespace), 'r', encoding='utf-8') as f:
+            return json.load(f)['response']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_llm_response(cache_dir, prompt, response_text, namespace=""):
+    """Stores an LLM response text for a prompt (written atomically via os.replace)."""
+    cache_path = _llm_cache_path(cache_dir, prompt, namespace)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'response': response_text}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def parse_llm_json_output(json_string):
     try:
         # Look for [START_JSON] and [END_JSON] tags
@@ -105,7 +271,7 @@ def parse_llm_json_output(json_string):
             if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
                 json_string = json_string[start_idx:end_idx+1]
         
-        return json.loads(json_string)
+        return _json_loads(json_string)
     except json.JSONDecodeError as e:
         return None
 
@@ -132,6 +298,35 @@ Example JSON format:
 Text: {text}
 """
 
+batch_extraction_prompt_template = """
+Extract entities and relationships from each of the numbered text chunks below.
+Entities should have a 'name' and 'type'.
+Relationships should have 'source', 'target', 'type', and 'description'.
+Output the result as a JSON object with one key: 'chunks', a list with one object per text chunk. Each object has three keys: 'chunk' (the chunk number), 'entities' (list of entity objects) and 'relationships' (list of relationship objects).
+IMPORTANT: Only output the JSON object, enclosed within [START_JSON] and [END_JSON] tags. Do not include any other text or markdown formatting outside these tags.
+
+Example JSON format:
+[START_JSON]
+{{
+    "chunks": [
+        {{
+            "chunk": 1,
+            "entities": [
+                {{"name": "Alice", "type": "Person"}},
+                {{"name": "Microsoft", "type": "Organization"}}
+            ],
+            "relationships": [
+                {{"source": "Alice", "target": "Microsoft", "type": "works_for", "description": "Alice works for Microsoft"}}
+            ]
+        }}
+    ]
+}}
+[END_JSON]
+
+Text chunks:
+{text}
+"""
+
 summary_prompt_template = """
 Summarize the following text, focusing on key entities and their relationships.
 Provide a concise summary and a list of key entities mentioned.
@@ -149,3 +344,26 @@ Example JSON format:
 
 Text: {text}
 """
+
+def _split_prompt_template(template):
+    """Splits a str.format template whose only field is {text} into its literal prefix and suffix."""
+    prefix, suffix = template.split("{text}")
+    return tuple(part.replace("{{", "{").replace("}}", "}") for part in (prefix, suffix))
+
+# Prompts are built by concatenation so the templates are not re-parsed by str.format per chunk
+_EXTRACTION_PROMPT_PREFIX, _EXTRACTION_PROMPT_SUFFIX = _split_prompt_template(extraction_prompt_template)
+_BATCH_EXTRACTION_PROMPT_PREFIX, _BATCH_EXTRACTION_PROMPT_SUFFIX = _split_prompt_template(batch_extraction_prompt_template)
+_SUMMARY_PROMPT_PREFIX, _SUMMARY_PROMPT_SUFFIX = _split_prompt_template(summary_prompt_template)
+
+def build_extraction_prompt(text):
+    """Returns extraction_prompt_template filled with text (same result as .format(text=text))."""
+    return _EXTRACTION_PROMPT_PREFIX + text + _EXTRACTION_PROMPT_SUFFIX
+
+def build_batch_extraction_prompt(texts):
+    """Returns batch_extraction_prompt_template filled with the texts as chunks numbered from 1."""
+    numbered = "\n\n".join(f"[CHUNK {number}]\n{text}" for number, text in enumerate(texts, 1))
+    return _BATCH_EXTRACTION_PROMPT_PREFIX + numbered + _BATCH_EXTRACTION_PROMPT_SUFFIX
+
+def build_summary_prompt(text):
+    """Returns summary_prompt_template filled with text (same result as .format(text=text))."""
+    return _SUMMARY_PROMPT_PREFIX + text + _SUMMARY_PROMPT_SUFFIX
@@ -29,11 +29,14 @@ def load_entities_from_parquet(output_dir: str) -> List[Entity]:
             logger.warning(f"No entities found in {output_dir}")
             return []
         
+        # Rows are read as plain dicts (to_dict) rather than one Series per row (iterrows)
+        has_id = 'id' in df.columns
+        extra_columns = [col for col in df.columns if col not in ['id', 'name', 'type', 'description']]
         entities = []
-        for _, row in df.iterrows():
+        for idx, row in zip(df.index, df.to_dict('records')):
             # Create Entity object from DataFrame row
             entity = Entity(
-                id=str(row.get('id', row.name)) if 'id' in df.columns else str(row.name),
+                id=str(row['id']) if has_id else str(idx),
                 name=row.get('name', ''),
                 type=row.get('type') if pd.notna(row.get('type')) else None,
                 description=row.get('description') if pd.notna(row.get('description')) else None,
@@ -41,11 +44,10 @@ def load_entities_from_parquet(output_dir: str) -> List[Entity]:
             )
             
             # Add any additional columns as properties
-            for col in df.columns:
-                if col not in ['id', 'name', 'type', 'description']:
-                    value = row.get(col)
-                    if pd.notna(value):
-                        entity.properties[col] = value
+            for col in extra_columns:
+                value = row[col]
+                if pd.notna(value):
+                    entity.properties[col] = value
             
             entities.append(entity)
         
@@ -75,25 +77,27 @@ def load_relationships_from_parquet(output_dir: str) -> List[Relationship]:
             logger.warning(f"No relationships found in {output_dir}")
             return []
         
+        has_id = 'id' in df.columns
+        has_weight = 'weight' in df.columns
+        extra_columns = [col for col in df.columns if col not in ['id', 'source', 'target', 'type', 'description', 'weight']]
         relationships = []
-        for idx, row in df.iterrows():
+        for idx, row in zip(df.index, df.to_dict('records')):
             # Create Relationship object from DataFrame row
             relationship = Relationship(
-                id=str(row.get('id', idx)) if 'id' in df.columns else str(idx),
+                id=str(row['id']) if has_id else str(idx),
                 source_id=str(row.get('source', '')),
                 target_id=str(row.get('target', '')),
                 type=str(row.get('type', 'RELATED')),
                 description=row.get('description') if pd.notna(row.get('description')) else None,
                 properties={},
-                weight=float(row.get('weight', 1.0)) if 'weight' in df.columns else 1.0
+                weight=float(row['weight']) if has_weight else 1.0
             )
             
             # Add any additional columns as properties
-            for col in df.columns:
-                if col not in ['id', 'source', 'target', 'type', 'description', 'weight']:
-                    value = row.get(col)
-                    if pd.notna(value):
-                        relationship.properties[col] = value
+            for col in extra_columns:
+                value = row[col]
+                if pd.notna(value):
+                    relationship.properties[col] = value
             
             relationships.append(relationship)
         
@@ -129,18 +133,21 @@ def load_text_units_from_parquet(output_dir: str) -> List[TextUnit]:
             logger.warning(f"No text units found in {output_dir}")
             return []
         
+        has_id = 'id' in df.columns
+        has_entity_ids = 'entity_ids' in df.columns
+        extra_columns = [col for col in df.columns if col not in ['id', 'text', 'entity_ids']]
         text_units = []
-        for idx, row in df.iterrows():
+        for idx, row in zip(df.index, df.to_dict('records')):
             # Create TextUnit object from DataFrame row
             text_unit = TextUnit(
-                id=str(row.get('id', idx)) if 'id' in df.columns else str(idx),
+                id=str(row['id']) if has_id else str(idx),
                 text=str(row.get('text', '')),
                 entity_ids=[],
                 metadata={}
             )
             
             # Parse entity IDs if available
-            if 'entity_ids' in df.columns and pd.notna(row.get('entity_ids')):
+            if has_entity_ids and pd.notna(row.get('entity_ids')):
                 entity_ids = row.get('entity_ids')
                 if isinstance(entity_ids, str):
                     # Assume comma-separated or similar format
@@ -149,11 +156,10 @@ def load_text_units_from_parquet(output_dir: str) -> List[TextUnit]:
                     text_unit.entity_ids = entity_ids
             
             # Add any additional columns as metadata
-            for col in df.columns:
-                if col not in ['id', 'text', 'entity_ids']:
-                    value = row.get(col)
-                    if pd.notna(value):
-                        text_unit.metadata[col] = value
+            for col in extra_columns:
+                value = row[col]
+                if pd.notna(value):
+                    text_unit.metadata[col] = value
             
             text_units.append(text_unit)
         
@@ -5,7 +5,7 @@ import logging
 from llama_index.core import VectorStoreIndex
 from llama_index.core.schema import QueryBundle
 
-from ..vector_store_manager import get_vector_store, get_index
+from ..vector_store_manager import get_vector_store, get_index, get_project_filters
 from .models import Entity
 
 logger = logging.getLogger(__name__)
@@ -71,7 +71,10 @@ class EntityMapper:
             k = top_k or self.top_k
             
             # Create a retriever from the index
-            retriever = self.entity_index.as_retriever(similarity_top_k=k)
+            retriever = self.entity_index.as_retriever(
+                similarity_top_k=k,
+                filters=get_project_filters(self.config)
+            )
             
             # Perform similarity search
             query_bundle = QueryBundle(query_str=query)
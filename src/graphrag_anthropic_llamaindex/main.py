@@ -5,12 +5,12 @@ from dotenv import load_dotenv
 
 from llama_index.llms.anthropic import Anthropic
 from llama_index.llms.bedrock import Bedrock
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.core import Settings
 from llama_index.core.node_parser import SentenceSplitter
 
 from graphrag_anthropic_llamaindex.config_manager import load_config
-from graphrag_anthropic_llamaindex.vector_store_manager import get_vector_store
+from graphrag_anthropic_llamaindex.embedding_utils import create_embedding_model
+from graphrag_anthropic_llamaindex.vector_store_manager import get_vector_store, get_project_filters
 from graphrag_anthropic_llamaindex.document_processor import add_documents
 from graphrag_anthropic_llamaindex.search_processor import search_index
 from graphrag_anthropic_llamaindex.file_filter import FileFilter
@@ -89,8 +89,7 @@ def main():
 
     # Configure embedding model
     embedding_config = config.get("embedding_model", {})
-    embed_model_name = embedding_config.get("name", "intfloat/multilingual-e5-small")
-    embed_model = HuggingFaceEmbedding(model_name=embed_model_name)
+    embed_model = create_embedding_model(embedding_config)
 
     # Configure chunking
     chunking_config = config.get("chunking", {})
@@ -136,7 +135,13 @@ def main():
         add_documents(input_dir, output_dir, main_vector_store,
                       entity_vector_store,
                       community_vector_store, community_detection_config,
-                      use_archive_reader=True, file_filter=file_filter)
+                      use_archive_reader=True, file_filter=file_filter,
+                      max_workers=config.get("ingest_max_workers"),
+                      max_concurrent_llm_calls=config.get("ingest_llm_concurrency"),
+                      use_llm_cache=config.get("ingest_llm_cache", True),
+                      min_chunk_chars=config.get("ingest_min_chunk_chars", 0),
+                      extraction_batch_chars=config.get("ingest_extraction_batch_chars", 0),
+                      project_id=config.get("vector_store", {}).get("project_id"))
     elif args.command == "search":
         # Handle backward compatibility with --target-index
         if args.target_index:
@@ -190,7 +195,8 @@ def main():
             print(f"Error during search: {e}")
             # Fallback to old search method
             search_index(args.query, output_dir, llm_params, main_vector_store,
-                        entity_vector_store, community_vector_store, args.target_index or "both")
+                        entity_vector_store, community_vector_store, args.target_index or "both",
+                        filters=get_project_filters(config))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default settings for the `query_cache` config section
+DEFAULT_QUERY_CACHE_MAX_SIZE = 128
+DEFAULT_QUERY_CACHE_TTL_SECONDS = 600
+DEFAULT_QUERY_CACHE_LOG_INTERVAL = 50
+
+# Default settings for the `semantic_cache` config section
+DEFAULT_SEMANTIC_CACHE_MAX_SIZE = 256
+DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.95
+
+
+def make_query_cache_key(*parts: Any) -> bytes:
+    """
+    Build a compact cache key from the given query parameters.
+
+    Args:
+        *parts: JSON-serializable values identifying the query
+            (e.g. normalized message, search mode, output_dir, ...)
+
+    Returns:
+        bytes: BLAKE2b digest of the serialized parameters
+    """
+    payload = json.dumps(list(parts), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+def normalize_query(message: str) -> str:
+    """Normalize a query string so trivially different inputs share a cache entry."""
+    return " ".join(message.split())
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with per-entry TTL for search results.
+
+    Entries are evicted in least-recently-used order once `max_size` is
+    exceeded, and treated as missing once older than `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_QUERY_CACHE_MAX_SIZE,
+        ttl_seconds: Optional[float] = DEFAULT_QUERY_CACHE_TTL_SECONDS,
+        log_interval: int = DEFAULT_QUERY_CACHE_LOG_INTERVAL,
+    ):
+        """
+        Initialize QueryCache.
+
+        Args:
+            max_size: Maximum number of entries kept. 0 disables the cache.
+            ttl_seconds: Entry lifetime in seconds. None or <= 0 means no expiry.
+            log_interval: Log hit/miss statistics every N lookups (0 disables).
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.log_interval = log_interval
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "QueryCache":
+        """
+        Create a QueryCache from the `query_cache` section of the configuration.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            QueryCache: Configured cache instance
+        """
+        cache_config = (config or {}).get("query_cache", {}) or {}
+        if not cache_config.get("enabled", True):
+            return cls(max_size=0)
+        return cls(
+            max_size=cache_config.get("max_size", DEFAULT_QUERY_CACHE_MAX_SIZE),
+            ttl_seconds=cache_config.get("ttl_seconds", DEFAULT_QUERY_CACHE_TTL_SECONDS),
+            log_interval=cache_config.get("log_interval", DEFAULT_QUERY_CACHE_LOG_INTERVAL),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on miss or expiry
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._maybe_log_stats()
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            self._maybe_log_stats()
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (e.g. after the index has been rebuilt)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def _maybe_log_stats(self) -> None:
+        if self.log_interval and (self.hits + self.misses) % self.log_interval == 0:
+            logger.info(f"Query cache stats: {self.stats()}")
+
+
+class _EmbeddingPartition:
+    """Fixed-size ring buffer of normalized embeddings, their cached values and insertion times."""
+
+    def __init__(self, max_size: int, dim: int):
+        self.matrix = np.zeros((max_size, dim), dtype=np.float32)
+        self.values: list = [None] * max_size
+        self.stored_at = np.zeros(max_size, dtype=np.float64)
+        self.count = 0
+        self.next_slot = 0
+
+    def add(self, embedding: np.ndarray, value: Any) -> None:
+        self.matrix[self.next_slot] = embedding
+        self.values[self.next_slot] = value
+        self.stored_at[self.next_slot] = time.monotonic()
+        self.next_slot = (self.next_slot + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def best_match(self, embedding: np.ndarray, min_stored_at: float) -> Optional[tuple[int, float]]:
+        """Return (slot, similarity) of the closest entry stored at or after `min_stored_at`."""
+        # Imported on first lookup so that numba is only loaded when the semantic cache is used
+        from .simsearch_kernels import cosine_topk
+
+        fresh = np.flatnonzero(self.stored_at[:self.count] >= min_stored_at)
+        if fresh.size == 0:
+            return None
+        candidates = self.matrix[fresh] if fresh.size < self.count else self.matrix[:self.count]
+        indices, scores = cosine_topk(candidates, embedding, 1)
+        return int(fresh[indices[0]]), float(scores[0])
+
+
+class SemanticQueryCache:
+    """
+    Thread-safe cache that matches queries by embedding cosine similarity.
+
+    Entries are partitioned by a caller-supplied key (e.g. search mode and
+    response type) so paraphrased queries only match results produced with
+    the same search parameters. Each partition keeps the most recent
+    `max_size` embeddings in one contiguous float32 matrix, so a lookup is a
+    single matrix-vector product. Entries older than `ttl_seconds` are never
+    returned, so answers expire on the same schedule as the exact-match cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_SEMANTIC_CACHE_MAX_SIZE,
+        threshold: float = DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: Optional[float] = DEFAULT_QUERY_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize SemanticQueryCache.
+
+        Args:
+            max_size: Maximum number of embeddings kept per partition. 0 disables the cache.
+            threshold: Minimum cosine similarity for a cached entry to be returned
+            ttl_seconds: Entry lifetime in seconds. None or <= 0 means no expiry.
+        """
+        self.max_size = max(0, int(max_size))
+        self.threshold = float(threshold)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._partitions: Dict[Hashable, _EmbeddingPartition] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SemanticQueryCache":
+        """
+        Create a SemanticQueryCache from the `semantic_cache` section of the configuration.
+
+        The semantic cache is opt-in because a paraphrase match may return
+        an answer to a slightly different question. Entries expire after the
+        `query_cache` section's `ttl_seconds`.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            SemanticQueryCache: Configured cache instance
+        """
+        cache_config = (config or {}).get("semantic_cache", {}) or {}
+        if not cache_config.get("enabled", False):
+            return cls(max_size=0)
+        query_cache_config = (config or {}).get("query_cache", {}) or {}
+        return cls(
+            max_size=cache_config.get("max_size", DEFAULT_SEMANTIC_CACHE_MAX_SIZE),
+            threshold=cache_config.get("threshold", DEFAULT_SEMANTIC_CACHE_THRESHOLD),
+            ttl_seconds=query_cache_config.get("ttl_seconds", DEFAULT_QUERY_CACHE_TTL_SECONDS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def lookup(self, partition: Hashable, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Return the cached value of the most similar query in the partition.
+
+        Args:
+            partition: Partition key (search parameters the value depends on)
+            embedding: Query embedding
+
+        Returns:
+            The cached value if it has not expired and its similarity is at
+            least `threshold`, otherwise None
+        """
+        if not self.enabled:
+            return None
+        vector = self._normalize(embedding)
+        min_stored_at = time.monotonic() - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+        with self._lock:
+            entries = self._partitions.get(partition)
+            if vector is not None and entries is not None and entries.count \
+                    and entries.matrix.shape[1] == vector.shape[0]:
+                match = entries.best_match(vector, min_stored_at)
+                if match is not None and match[1] >= self.threshold:
+                    best, score = match
+                    self.hits += 1
+                    logger.debug(f"Semantic cache hit (similarity={score:.4f})")
+                    return entries.values[best]
+            self.misses += 1
+            return None
+
+    def add(self, partition: Hashable, embedding: Sequence[float], value: Any) -> None:
+        """
+        Store a value under the given query embedding.
+
+        Args:
+            partition: Partition key (search parameters the value depends on)
+            embedding: Query embedding
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            entries = self._partitions.get(partition)
+            if entries is None or entries.matrix.shape[1] != vector.shape[0]:
+                entries = _EmbeddingPartition(self.max_size, vector.shape[0])
+                self._partitions[partition] = entries
+            entries.add(vector, value)
+
+    def clear(self) -> None:
+        """Remove all entries (e.g. after the index has been rebuilt)."""
+        with self._lock:
+            self._partitions.clear()
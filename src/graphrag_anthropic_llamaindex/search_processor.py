@@ -7,8 +7,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def search_index(query, output_dir, llm_params, vector_store=None, entity_vector_store=None, community_vector_store=None, target_index="both", mode="auto"):
-    """Searches the main text index and optionally the entity index with a given query."""
+def search_index(query, output_dir, llm_params, vector_store=None, entity_vector_store=None, community_vector_store=None, target_index="both", mode="auto", filters=None):
+    """Searches the main text index and optionally the entity index with a given query.
+
+    `filters` (see get_project_filters) restricts every vector search to one project.
+    """
     main_index = None
     entity_index = None
     community_index = None
@@ -58,7 +61,7 @@ def search_index(query, output_dir, llm_params, vector_store=None, entity_vector
     if main_index and target_index in ["main", "both"]:
         print("Searching main text index...")
         try:
-            main_query_engine = main_index.as_query_engine(llm=Settings.llm)
+            main_query_engine = main_index.as_query_engine(llm=Settings.llm, filters=filters)
             main_response = main_query_engine.query(query)
             print("Main Text Response:", main_response)
         except Exception as e:
@@ -67,7 +70,7 @@ def search_index(query, output_dir, llm_params, vector_store=None, entity_vector
     if entity_index and target_index in ["entity", "both"]:
         print("\nSearching entity index...")
         try:
-            entity_query_engine = entity_index.as_query_engine(llm=Settings.llm)
+            entity_query_engine = entity_index.as_query_engine(llm=Settings.llm, filters=filters)
             entity_response = entity_query_engine.query(query)
             print("Entity Response:", entity_response)
         except Exception as e:
@@ -76,7 +79,7 @@ def search_index(query, output_dir, llm_params, vector_store=None, entity_vector
     if community_index and target_index in ["community", "both"]:
         print("\nSearching community summary index...")
         try:
-            community_query_engine = community_index.as_query_engine(llm=Settings.llm)
+            community_query_engine = community_index.as_query_engine(llm=Settings.llm, filters=filters)
             community_response = community_query_engine.query(query)
             print("Community Summary Response:", community_response)
         except Exception as e:
@@ -0,0 +1,80 @@
+import numpy as np
+
+try:
+    # numba is optional; without it the NumPy (BLAS) implementation is used
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this many rows a single BLAS call (np.dot) is faster than the parallel
+# numba kernel, whose thread dispatch dominates on small matrices
+NUMBA_MIN_ROWS = 4096
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _inner_products_numba(mat, q):
+        n, d = mat.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(d):
+                acc += mat[i, j] * q[j]
+            scores[i] = acc
+        return scores
+
+
+def _inner_products(mat, q):
+    if NUMBA_AVAILABLE and mat.shape[0] >= NUMBA_MIN_ROWS:
+        return _inner_products_numba(mat, q)
+    return np.dot(mat, q)
+
+
+def cosine_topk(mat: np.ndarray, q: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the indices and scores of the k rows most similar to the query.
+
+    Rows of `mat` and `q` are expected to be L2-normalized, so the inner
+    product equals the cosine similarity.
+
+    Args:
+        mat: (N, D) float32 matrix of normalized embeddings
+        q: (D,) float32 normalized query embedding
+        k: Number of results to return
+
+    Returns:
+        tuple: (int32 indices, float32 scores), sorted by descending score
+    """
+    n = mat.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    scores = _inner_products(
+        np.ascontiguousarray(mat, dtype=np.float32),
+        np.ascontiguousarray(q, dtype=np.float32),
+    )
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order.astype(np.int32), scores[order].astype(np.float32)
+
+
+def warm_up_kernels() -> bool:
+    """
+    Compile (or load the cached compilation of) the numba kernels.
+
+    Intended to be called from a background thread so the first query does
+    not pay the compilation cost.
+
+    Returns:
+        bool: True if the kernels were compiled, False when numba is unavailable
+    """
+    if not NUMBA_AVAILABLE:
+        return False
+    dummy = np.ones((2, 4), dtype=np.float32)
+    _inner_products_numba(dummy, dummy[0])
+    return True
@@ -13,6 +13,48 @@ VECTOR_STORE_TABLE_NAMES = {
     "community": "community_vectors"  # Community vectors
 }
 
+# Metadata key used to scope vectors to the output_dir (project) they were ingested for
+PROJECT_METADATA_KEY = "project"
+
+def get_project_id(output_dir, project_id=None):
+    """Returns the project identifier stored in vector metadata.
+
+    An explicit `project_id` (`vector_store.project_id` in the config) is used
+    as is; otherwise the output_dir with symlinks resolved identifies the project.
+    """
+    if project_id:
+        return str(project_id)
+    return os.path.realpath(output_dir)
+
+def tag_project_metadata(documents, project_id):
+    """Tags documents with the project they belong to.
+
+    The tag is excluded from embedding and LLM text so it does not change
+    embeddings or prompts. Nodes split from a document inherit it.
+    """
+    for doc in documents:
+        doc.metadata[PROJECT_METADATA_KEY] = project_id
+        if PROJECT_METADATA_KEY not in doc.excluded_embed_metadata_keys:
+            doc.excluded_embed_metadata_keys.append(PROJECT_METADATA_KEY)
+        if PROJECT_METADATA_KEY not in doc.excluded_llm_metadata_keys:
+            doc.excluded_llm_metadata_keys.append(PROJECT_METADATA_KEY)
+    return documents
+
+def get_project_filters(config):
+    """Returns metadata filters restricting vector search to the configured output_dir.
+
+    Enabled with `vector_store.filter_by_project: True`. The filter is pushed
+    into the vector store query, so stores shared by several output_dirs only
+    score vectors of the current project. Indexes built before nodes were
+    tagged have no project metadata, hence the opt-in.
+    """
+    vs_config = config.get("vector_store", {})
+    if not vs_config.get("filter_by_project", False):
+        return None
+    from llama_index.core.vector_stores import ExactMatchFilter, MetadataFilters
+    project_id = get_project_id(config.get("output_dir", "."), vs_config.get("project_id"))
+    return MetadataFilters(filters=[ExactMatchFilter(key=PROJECT_METADATA_KEY, value=project_id)])
+
 def get_vector_store(config, store_type="main"):
     """Initializes the vector store based on the configuration.
     
@@ -0,0 +1,32 @@
+"""
+Unit tests for load_config caching
+"""
+
+import os
+
+from graphrag_anthropic_llamaindex.config_manager import load_config
+
+
+def test_load_config_returns_independent_copies(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("output_dir: ./out\nchunking:\n  chunk_size: 512\n")
+
+    first = load_config(str(config_path))
+    first["chunking"]["chunk_size"] = 1
+    second = load_config(str(config_path))
+    assert second["chunking"]["chunk_size"] == 512
+
+
+def test_load_config_reloads_modified_file(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("output_dir: ./out\n")
+    assert load_config(str(config_path))["output_dir"] == "./out"
+
+    config_path.write_text("output_dir: ./other_out\n")
+    st = os.stat(config_path)
+    os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_config(str(config_path))["output_dir"] == "./other_out"
+
+
+def test_load_config_missing_file(tmp_path):
+    assert load_config(str(tmp_path / "missing.yaml")) is None
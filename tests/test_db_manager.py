@@ -0,0 +1,144 @@
+"""
+Unit tests for db_manager file fingerprints and Parquet tables
+"""
+
+import os
+
+import pandas as pd
+
+from graphrag_anthropic_llamaindex.db_manager import (
+    append_entities_db,
+    append_relationships_db,
+    load_entities_db,
+    load_relationships_db,
+    mask_processed_hashes,
+    save_entities_db,
+    get_file_fingerprint,
+    get_processed_fingerprints,
+    record_file_fingerprints,
+)
+
+
+def test_file_fingerprint_changes_with_mtime(tmp_path):
+    file_path = tmp_path / "doc.txt"
+    file_path.write_text("content")
+    fingerprint = get_file_fingerprint(str(file_path))
+    assert fingerprint == get_file_fingerprint(str(file_path))
+
+    st = os.stat(file_path)
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert get_file_fingerprint(str(file_path)) != fingerprint
+    assert get_file_fingerprint(str(tmp_path / "missing.txt")) is None
+
+
+def test_record_file_fingerprints_fills_missing_and_replaces_stale():
+    df = pd.DataFrame({"filepath": ["a", "b"], "hash": ["h1", "h2"]})
+    assert get_processed_fingerprints(df) == set()
+
+    df, changed = record_file_fingerprints(df, {"h1": "1:2:3:4"})
+    assert changed == 1
+    assert get_processed_fingerprints(df) == {"1:2:3:4"}
+
+    # h1 was touched (same content, new mtime): its stale fingerprint is replaced
+    df, changed = record_file_fingerprints(df, {"h1": "9:9:9:9", "h2": "5:6:7:8"})
+    assert changed == 2
+    assert get_processed_fingerprints(df) == {"9:9:9:9", "5:6:7:8"}
+
+    df, changed = record_file_fingerprints(df, {"h1": "9:9:9:9", "h3": "0:0:0:0"})
+    assert changed == 0
+    assert get_processed_fingerprints(df) == {"9:9:9:9", "5:6:7:8"}
+
+
+def test_append_entities_db_deduplicates_against_existing_rows(tmp_path):
+    output_dir = str(tmp_path)
+    first = pd.DataFrame([{"name": "Alice", "type": "Person"}, {"name": "Acme", "type": "Org"}])
+    assert append_entities_db(first, output_dir) == 2
+
+    second = pd.DataFrame([
+        {"name": "Alice", "type": "Person"},
+        {"name": "Bob", "type": "Person"},
+        {"name": "Bob", "type": "Person"},
+    ])
+    assert append_entities_db(second, output_dir) == 1
+
+    entities = load_entities_db(output_dir)
+    assert list(zip(entities["name"], entities["type"])) == [("Alice", "Person"), ("Acme", "Org"), ("Bob", "Person")]
+
+
+def test_append_converts_legacy_single_file_table(tmp_path):
+    output_dir = str(tmp_path)
+    save_entities_db(pd.DataFrame([{"name": "Alice", "type": "Person"}]), output_dir)
+    assert os.path.isfile(tmp_path / "entities.parquet")
+
+    append_entities_db(pd.DataFrame([{"name": "Bob", "type": "Person"}]), output_dir)
+    assert os.path.isdir(tmp_path / "entities.parquet")
+    assert load_entities_db(output_dir)["name"].tolist() == ["Alice", "Bob"]
+
+
+def test_append_relationships_treats_missing_values_as_equal(tmp_path):
+    output_dir = str(tmp_path)
+    rel = {"source": "Alice", "target": "Acme", "type": "works_for", "description": None}
+    assert append_relationships_db(pd.DataFrame([rel]), output_dir) == 1
+    assert append_relationships_db(pd.DataFrame([rel]), output_dir) == 0
+    assert len(load_relationships_db(output_dir)) == 1
+
+
+def test_append_relationships_to_parts_without_all_key_columns(tmp_path):
+    output_dir = str(tmp_path)
+    assert append_relationships_db([{"source": "Alice", "target": "Acme", "type": "works_for"}], output_dir) == 1
+    rel = {"source": "Alice", "target": "Acme", "type": "works_for", "description": None}
+    assert append_relationships_db([rel], output_dir) == 0
+    assert append_relationships_db([dict(rel, description="Alice works for Acme")], output_dir) == 1
+
+
+def test_append_entities_db_accepts_records(tmp_path):
+    output_dir = str(tmp_path)
+    records = [
+        {"name": "Alice", "type": "Person"},
+        {"name": "Alice", "type": "Person", "description": "duplicate"},
+        {"name": "Alice", "type": "Org"},
+    ]
+    assert append_entities_db(records, output_dir) == 2
+    assert append_entities_db(records, output_dir) == 0
+
+
+def test_append_records_keep_union_of_columns(tmp_path):
+    output_dir = str(tmp_path)
+    records = [
+        {"name": "Alice", "type": "Person"},
+        {"name": "Acme", "type": "Org", "description": "A company"},
+    ]
+    append_entities_db(records, output_dir)
+    entities = load_entities_db(output_dir)
+    assert entities["description"].tolist() == [None, "A company"]
+
+
+def test_append_compacts_parts_past_limit(tmp_path, monkeypatch):
+    import graphrag_anthropic_llamaindex.db_manager as db_manager
+
+    monkeypatch.setattr(db_manager, "MAX_TABLE_PARTS", 3)
+    output_dir = str(tmp_path)
+    for i in range(5):
+        append_entities_db([{"name": f"Entity {i}", "type": "Org" if i % 2 else None}], output_dir)
+
+    parts = os.listdir(os.path.join(output_dir, "entities.parquet"))
+    assert len(parts) <= 3 and all(part.endswith(".parquet") for part in parts)
+    entities = load_entities_db(output_dir)
+    assert sorted(entities["name"]) == [f"Entity {i}" for i in range(5)]
+    assert append_entities_db([{"name": "Entity 0", "type": None}], output_dir) == 0
+
+
+def test_load_parts_with_different_columns(tmp_path):
+    output_dir = str(tmp_path)
+    append_entities_db([{"name": "Alice", "type": "Person"}], output_dir)
+    append_entities_db([{"name": "Acme", "type": "Org", "description": "A company"}], output_dir)
+    entities = load_entities_db(output_dir)
+    assert entities["name"].tolist() == ["Alice", "Acme"]
+    assert entities["description"].tolist() == [None, "A company"]
+
+
+def test_mask_processed_hashes():
+    df = pd.DataFrame({"filepath": ["a", "b"], "hash": ["h1", "h2"]})
+    assert mask_processed_hashes(df, ["h2", "h3", "h1"]) == [True, False, True]
+    assert mask_processed_hashes(df, []) == []
+    assert mask_processed_hashes(pd.DataFrame(columns=["filepath", "hash"]), ["h1"]) == [False]
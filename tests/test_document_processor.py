@@ -0,0 +1,324 @@
+"""
+Unit tests for document_processor helpers
+"""
+
+import asyncio
+import hashlib
+import os
+import tarfile
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from llama_index.core.schema import Document
+
+from graphrag_anthropic_llamaindex.document_processor import _calculate_document_hash, _complete_prompts, _create_archive_filesystem, _csv_row_texts, _embed_nodes, _flatten_metadata, _join_within_budget, _may_contain_entities, _pack_chunks, _process_archive_files, _process_csv_file, _raise_for_failed_prompts, _read_csv, _run_coroutine, _run_llm_stages, _scan_files, _split_extraction_result
+from graphrag_anthropic_llamaindex.file_filter import FileFilter
+from graphrag_anthropic_llamaindex.llm_utils import parse_llm_json_output
+
+
+def _iterrows_texts(df):
+    return [", ".join(f"{col}: {val}" for col, val in row.items()) for _, row in df.iterrows()]
+
+
+def test_csv_row_texts_matches_row_by_row_rendering():
+    df = pd.DataFrame({
+        "name": ["Alice", "Bob", None],
+        "age": [30, 41, 25],
+        "score": [1.5, float("nan"), 3.0],
+    })
+    assert _csv_row_texts(df) == _iterrows_texts(df)
+
+
+def test_csv_row_texts_batches_match_single_pass(monkeypatch):
+    import graphrag_anthropic_llamaindex.document_processor as document_processor
+
+    df = pd.DataFrame({"name": ["Alice", "Bob", "Carol", None, "Eve"], "age": [30, None, 25, 41, 38]})
+    expected = _csv_row_texts(df)
+    monkeypatch.setattr(document_processor, "CSV_TEXT_BATCH_ROWS", 2)
+    assert _csv_row_texts(df) == expected
+
+
+def test_csv_row_texts_single_column_and_empty():
+    df = pd.DataFrame({"name": ["Alice", "Bob"]})
+    assert _csv_row_texts(df) == ["name: Alice", "name: Bob"]
+    assert _csv_row_texts(pd.DataFrame()) == []
+
+
+def test_process_csv_file_creates_document_per_row(tmp_path):
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text("name,city\nAlice,Tokyo\nBob,Osaka\n")
+
+    documents = _process_csv_file(str(csv_path))
+    assert [doc.text for doc in documents] == ["name: Alice, city: Tokyo", "name: Bob, city: Osaka"]
+    assert [doc.extra_info["row_index"] for doc in documents] == [0, 1]
+    assert documents[0].extra_info["source_path"] == str(csv_path)
+
+
+def test_complete_prompts_bounds_concurrency_and_keeps_order():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_llm(prompt):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if prompt == "bad":
+            raise ValueError("boom")
+        return prompt.upper()
+
+    prompts = ["a", "b", "bad", "c", "d"]
+    with patch("graphrag_anthropic_llamaindex.document_processor._aget_full_llm_response_with_continuation", side_effect=fake_llm):
+        results = asyncio.run(_complete_prompts(prompts, max_concurrent=2))
+
+    assert results[:2] == ["A", "B"] and results[3:] == ["C", "D"]
+    assert isinstance(results[2], ValueError)
+    assert max_in_flight == 2
+
+
+def test_scan_files_matches_os_walk(tmp_path):
+    (tmp_path / "sub" / "nested").mkdir(parents=True)
+    for relative_path in ["a.txt", "b.csv", "sub/c.md", "sub/nested/d.pdf"]:
+        (tmp_path / relative_path).write_text("x")
+
+    walked = [os.path.join(root, name) for root, _, files in os.walk(str(tmp_path)) for name in files]
+    scanned = dict(_scan_files(str(tmp_path)))
+    assert sorted(scanned) == sorted(walked)
+    assert all(entry.stat().st_size == 1 for entry in scanned.values())
+
+    top_level = [path for path, _ in _scan_files(str(tmp_path), recursive=False)]
+    assert sorted(top_level) == sorted([str(tmp_path / "a.txt"), str(tmp_path / "b.csv")])
+
+
+def test_complete_prompts_uses_persistent_cache(tmp_path):
+    calls = []
+
+    async def fake_llm(prompt):
+        calls.append(prompt)
+        return "[START_JSON]{}[END_JSON]" if prompt == "ok" else "not json"
+
+    cache_dir = str(tmp_path / "llm_cache")
+    with patch("graphrag_anthropic_llamaindex.document_processor._aget_full_llm_response_with_continuation", side_effect=fake_llm):
+        asyncio.run(_complete_prompts(["ok", "bad"], 4, cache_dir))
+        results = asyncio.run(_complete_prompts(["ok", "bad"], 4, cache_dir))
+
+    assert results == ["[START_JSON]{}[END_JSON]", "not json"]
+    # Only the malformed response is requested again
+    assert calls == ["ok", "bad", "bad"]
+
+
+def test_run_coroutine_inside_running_event_loop():
+    async def answer():
+        return 42
+
+    async def caller():
+        # asyncio.run would raise here because a loop is already running
+        return _run_coroutine(answer())
+
+    assert _run_coroutine(answer()) == 42
+    assert asyncio.run(caller()) == 42
+
+
+def test_llm_stages_share_one_event_loop():
+    # The LLM's async HTTP connections are bound to one loop, so both stages must run on it
+    loops = []
+    outputs = [
+        [{"entities": [{"name": "Alice"}, {"name": "Bob"}], "relationships": [{"source": "Alice", "target": "Bob"}]}],
+        [{"title": "People", "summary": "Alice and Bob"}],
+    ]
+
+    async def fake_complete_prompts(prompts, *args, **kwargs):
+        loops.append(asyncio.get_running_loop())
+        return outputs[len(loops) - 1]
+
+    pending_tables = []
+    with patch("graphrag_anthropic_llamaindex.document_processor._complete_prompts", side_effect=fake_complete_prompts), \
+            patch("graphrag_anthropic_llamaindex.document_processor.cluster_graph", return_value=[(0, 1, -1, ["Alice", "Bob"])]):
+        entities, summary_documents = _run_coroutine(_run_llm_stages(
+            [SimpleNamespace(text="Alice works with Bob")], pending_tables, {"max_cluster_size": 10}, 4, None, 0, 0,
+        ))
+
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert [entity["name"] for entity in entities] == ["Alice", "Bob"]
+    assert [doc.text for doc in summary_documents] == ["Alice and Bob"]
+    assert [table for _, _, table in pending_tables] == ["entities.parquet", "relationships.parquet", "communities.parquet", "community_summaries.parquet"]
+
+
+def test_join_within_budget():
+    assert _join_within_budget(["aaa", "bb", "c"], 100) == ("aaa bb c", 0)
+    assert _join_within_budget(["aaa", "bb", "c"], 6) == ("aaa bb", 1)
+    # Stops at the first part over budget instead of skipping to smaller ones
+    assert _join_within_budget(["aaa", "bbbbbb", "c"], 6) == ("aaa", 2)
+    assert _join_within_budget(["aaaaaaaa", "b"], 4) == ("aaaa", 1)
+
+
+def test_embed_nodes_embeds_each_distinct_text_once():
+    documents = [Document(text=name, extra_info={"type": "Person"}) for name in ["Alice", "Bob", "Alice"]]
+    embed_model = MagicMock()
+    embed_model.get_text_embedding_batch.side_effect = lambda texts, show_progress: [[float(len(t))] for t in texts]
+    with patch("graphrag_anthropic_llamaindex.document_processor.Settings", SimpleNamespace(embed_model=embed_model)):
+        _embed_nodes(documents)
+        _embed_nodes([])
+
+    embed_model.get_text_embedding_batch.assert_called_once()
+    assert len(embed_model.get_text_embedding_batch.call_args.args[0]) == 2
+    assert documents[0].embedding == documents[2].embedding
+    assert documents[1].embedding is not None
+
+
+def test_read_csv_matches_c_parser(tmp_path):
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text("name,age,joined\nAlice,30,2024-01-01 10:00\nBob,,2024-02-01 09:30\n", encoding="utf-8")
+    expected = pd.read_csv(csv_path)
+    assert _csv_row_texts(_read_csv(str(csv_path))) == _csv_row_texts(expected)
+    with open(csv_path, "rb") as f:
+        assert _csv_row_texts(_read_csv(f)) == _csv_row_texts(expected)
+
+
+def test_read_csv_renders_empty_strings_like_c_parser(tmp_path):
+    # pyarrow reads empty string cells as None, the C parser as NaN
+    csv_path = tmp_path / "cities.csv"
+    csv_path.write_text("name,city\nAlice,\nBob,Paris\n", encoding="utf-8")
+    expected = _csv_row_texts(pd.read_csv(csv_path))
+    assert expected == ["name: Alice, city: nan", "name: Bob, city: Paris"]
+    assert _csv_row_texts(_read_csv(str(csv_path))) == expected
+
+
+def test_read_csv_falls_back_for_quoted_newlines(tmp_path):
+    csv_path = tmp_path / "notes.csv"
+    csv_path.write_text('id,note\n1,"line one\nline two"\n2,plain\n', encoding="utf-8")
+    with open(csv_path, "rb") as f:
+        df = _read_csv(f)
+    assert df["note"].tolist() == ["line one\nline two", "plain"]
+
+
+def test_flatten_metadata_json_encodes_non_scalars():
+    record = {"community_id": 3, "summary": "要約", "rating": 7.5, "stale": False, "title": None, "key_entities": ["東京", "Acme"]}
+    flat = _flatten_metadata(record)
+    assert flat["key_entities"] == '["東京", "Acme"]'
+    assert {key: flat[key] for key in record if key != "key_entities"} == {key: value for key, value in record.items() if key != "key_entities"}
+
+
+def test_complete_prompts_skips_lookups_without_cache_dir(tmp_path):
+    async def fake_llm(prompt):
+        return "[START_JSON]{}[END_JSON]"
+
+    cache_dir = str(tmp_path / "llm_cache")
+    with patch("graphrag_anthropic_llamaindex.document_processor._aget_full_llm_response_with_continuation", side_effect=fake_llm), \
+            patch("graphrag_anthropic_llamaindex.document_processor.load_cached_llm_response") as load_cached:
+        asyncio.run(_complete_prompts(["a", "b"], 2, cache_dir))
+        load_cached.assert_not_called()
+        asyncio.run(_complete_prompts(["a", "b"], 2, cache_dir))
+        assert load_cached.call_count == 2
+
+
+def test_raise_for_failed_prompts_reports_all_failures(capsys):
+    _raise_for_failed_prompts(["ok", "ok"], ["chunk 1", "chunk 2"], "Entity extraction", "extracting from")
+
+    first_error = ValueError("boom")
+    outputs = ["ok", first_error, "ok", TimeoutError("slow")]
+    with pytest.raises(RuntimeError, match="failed for 2 of 4 items") as excinfo:
+        _raise_for_failed_prompts(outputs, [f"chunk {i+1}" for i in range(4)], "Entity extraction", "extracting from")
+
+    assert excinfo.value.__cause__ is first_error
+    out = capsys.readouterr().out
+    assert "Error extracting from chunk 2: boom" in out and "Error extracting from chunk 4: slow" in out
+
+
+def test_complete_prompts_requests_duplicate_prompts_once():
+    calls = []
+
+    async def fake_llm(prompt):
+        calls.append(prompt)
+        return prompt.upper()
+
+    with patch("graphrag_anthropic_llamaindex.document_processor._aget_full_llm_response_with_continuation", side_effect=fake_llm):
+        results = asyncio.run(_complete_prompts(["a", "b", "a", "c", "b"], 4))
+
+    assert results == ["A", "B", "A", "C", "B"]
+    assert sorted(calls) == ["a", "b", "c"]
+
+
+def test_calculate_document_hash_matches_concatenated_digest():
+    text, source_path = "東京の本社", "archive.zip!/docs/a.txt"
+    expected = hashlib.sha256(f"{text}:{source_path}".encode("utf-8")).hexdigest()
+    assert _calculate_document_hash(text, source_path) == expected
+
+
+def test_may_contain_entities():
+    assert _may_contain_entities("東京本社")
+    assert _may_contain_entities("name: Alice")
+    assert not _may_contain_entities("")
+    assert not _may_contain_entities(" --- \n ・・・ ")
+    assert not _may_contain_entities("name: Alice", min_chars=20)
+
+
+def test_create_archive_filesystem_from_open_file(tmp_path):
+    archive_path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("docs/a.txt", "hello " * 1000)
+
+    with open(archive_path, "rb", buffering=1024 * 1024) as archive_file:
+        archive_fs = _create_archive_filesystem(str(archive_path), archive_file)
+        assert archive_fs.find("", detail=False) == ["docs/a.txt"]
+        with archive_fs.open("docs/a.txt", "rb") as member:
+            assert member.read() == b"hello " * 1000
+
+
+def test_create_archive_filesystem_handles_compressed_tar(tmp_path):
+    source = tmp_path / "a.txt"
+    source.write_text("hello", encoding="utf-8")
+    archive_path = tmp_path / "docs.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as archive:
+        archive.add(source, arcname="a.txt")
+
+    archive_fs = _create_archive_filesystem(str(archive_path))
+    assert archive_fs.cat("a.txt") == b"hello"
+    with pytest.raises(ValueError):
+        _create_archive_filesystem(str(tmp_path / "docs.rar"))
+
+
+def test_complete_prompts_parse_json_parses_each_response_once(tmp_path):
+    async def fake_llm(prompt):
+        return "[START_JSON]{\"n\": 1}[END_JSON]" if prompt == "ok" else "not json"
+
+    cache_dir = str(tmp_path / "llm_cache")
+    with patch("graphrag_anthropic_llamaindex.document_processor._aget_full_llm_response_with_continuation", side_effect=fake_llm), \
+            patch("graphrag_anthropic_llamaindex.document_processor.parse_llm_json_output", wraps=parse_llm_json_output) as parse:
+        assert asyncio.run(_complete_prompts(["ok", "bad"], 2, cache_dir, parse_json=True)) == [{"n": 1}, None]
+        assert parse.call_count == 2
+        # Cache hits are parsed once as well
+        assert asyncio.run(_complete_prompts(["ok"], 2, cache_dir, parse_json=True)) == [{"n": 1}]
+        assert parse.call_count == 3
+
+
+def test_pack_chunks_groups_in_order_within_budget():
+    nodes = [SimpleNamespace(text="x" * length) for length in [3, 4, 2, 10, 1, 1]]
+    assert _pack_chunks(nodes, [0, 1, 2, 3, 4, 5], 7) == [[0, 1], [2], [3], [4, 5]]
+    assert _pack_chunks(nodes, [0, 2, 4], 100) == [[0, 2, 4]]
+    assert _pack_chunks(nodes, [], 7) == []
+
+
+def test_split_extraction_result():
+    single = {"entities": [{"name": "Alice"}], "relationships": []}
+    assert _split_extraction_result([4], single) == [(4, single)]
+    assert _split_extraction_result([4, 7], None) == []
+
+    first, second, unknown = {"chunk": 1, "entities": []}, {"chunk": 2, "entities": []}, {"chunk": 9, "entities": []}
+    batched = {"chunks": [second, first, unknown, "noise"]}
+    assert _split_extraction_result([4, 7], batched) == [(7, second), (4, first), (None, unknown)]
+
+
+def test_process_archive_files_reads_csv_members_in_order(tmp_path):
+    archive_path = tmp_path / "tables.zip"
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i in range(6):
+            archive.writestr(f"t{i}.csv", f"id,name\n{i},row {i}\n")
+
+    documents = _process_archive_files(str(archive_path), {}, False, FileFilter())
+    assert [doc.text for doc in documents] == [f"id: {i}, name: row {i}" for i in range(6)]
+    assert documents[0].extra_info["virtual_path"] == f"{archive_path}!/t0.csv"
@@ -116,6 +116,28 @@ class TestDriftSearchEngine:
                     assert "communities" in context
 
 
+    @pytest.mark.asyncio
+    async def test_streaming_search_raise_errors(self, mock_vector_stores, mock_config):
+        """Test that streaming errors are raised instead of yielded as text when requested."""
+        engine = DriftSearchEngine(
+            config=mock_config,
+            vector_stores=mock_vector_stores,
+            llm=MagicMock(),
+        )
+        
+        with patch.object(engine.local_searcher, "search_entities", AsyncMock(return_value=[])), \
+                patch.object(engine.global_searcher, "search_communities", AsyncMock(return_value=[])):
+            engine.response_generator.llm.astream_chat = AsyncMock(side_effect=RuntimeError("LLM down"))
+            
+            chunks = [chunk async for chunk in await engine.search("test query", streaming=True, include_context=False)]
+            assert len(chunks) == 1 and "LLM down" in chunks[0]
+            
+            stream = await engine.search("test query", streaming=True, include_context=False, raise_errors=True)
+            with pytest.raises(RuntimeError, match="LLM down"):
+                async for _ in stream:
+                    pass
+
+
 class TestLocalSearcher:
     """Test LocalSearcher class."""
     
@@ -248,6 +270,19 @@ class TestGlobalSearcher:
             assert results[0].summary == "Test Summary"
             assert len(results[0].entities) == 2
 
+    @pytest.mark.asyncio
+    async def test_search_communities_applies_project_filters(self, mock_vector_stores):
+        """Test that project filters are pushed into the vector store query."""
+        filters = MagicMock()
+        searcher = GlobalSearcher(mock_vector_stores, filters=filters)
+        mock_vector_stores["community"].query.return_value = MagicMock(nodes=[])
+
+        with patch("graphrag_anthropic_llamaindex.drift_search.global_searcher.load_community_summaries_db"):
+            await searcher.search_communities("test query")
+
+        query_obj = mock_vector_stores["community"].query.call_args[0][0]
+        assert query_obj.filters is filters
+
 
 class TestContextBuilder:
     """Test ContextBuilder class."""
@@ -0,0 +1,31 @@
+"""
+Unit tests for CachedEmbedding
+"""
+
+from unittest.mock import patch
+
+from llama_index.core.embeddings import MockEmbedding
+
+from graphrag_anthropic_llamaindex.embedding_cache import CachedEmbedding
+
+
+def test_query_embeddings_are_cached():
+    inner = MockEmbedding(embed_dim=8)
+    cached = CachedEmbedding(inner, cache_size=2)
+
+    with patch.object(MockEmbedding, "_get_query_embedding", return_value=[0.5] * 8) as mock_embed:
+        assert cached.get_query_embedding("query") == [0.5] * 8
+        assert cached.get_query_embedding("query") == [0.5] * 8
+        assert mock_embed.call_count == 1
+
+        cached.get_query_embedding("second")
+        cached.get_query_embedding("third")  # evicts "query"
+        cached.get_query_embedding("query")
+        assert mock_embed.call_count == 4
+
+
+def test_text_embeddings_pass_through():
+    inner = MockEmbedding(embed_dim=8)
+    cached = CachedEmbedding(inner)
+    assert cached.get_text_embedding("text") == inner.get_text_embedding("text")
+    assert cached.embed_batch_size == inner.embed_batch_size
@@ -0,0 +1,152 @@
+"""
+Unit tests for llm_utils JSON parsing and the LLM response cache
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from graphrag_anthropic_llamaindex import llm_utils
+from graphrag_anthropic_llamaindex.llm_utils import (
+    _aget_full_llm_response_with_continuation,
+    _get_full_llm_response_with_continuation,
+    _is_retryable_error,
+    _retry_delay,
+    _stitch_responses,
+    build_batch_extraction_prompt,
+    build_extraction_prompt,
+    build_summary_prompt,
+    extraction_prompt_template,
+    load_cached_llm_response,
+    parse_llm_json_output,
+    save_cached_llm_response,
+    summary_prompt_template,
+)
+
+
+def test_parse_tagged_json():
+    text = 'noise [START_JSON]{"entities": [{"name": "東京", "type": "City"}]}[END_JSON] trailing'
+    assert parse_llm_json_output(text) == {"entities": [{"name": "東京", "type": "City"}]}
+
+
+def test_parse_fenced_json():
+    assert parse_llm_json_output('```json\n{"a": 1}\n```') == {"a": 1}
+
+
+def test_parse_invalid_json_returns_none():
+    assert parse_llm_json_output('[START_JSON]{"a": [1, 2[END_JSON]') is None
+
+
+def test_stitch_responses_removes_longest_overlap():
+    assert _stitch_responses('{"a": [1, 2', '[1, 2, 3]}') == '{"a": [1, 2, 3]}'
+    assert _stitch_responses("abab", "ababc") == "ababc"
+    assert _stitch_responses("abc", "xyz") == "abcxyz"
+    assert _stitch_responses("", "xyz") == "xyz"
+    assert _stitch_responses("abc", "") == "abc"
+
+
+def test_stitch_responses_limits_overlap_to_window():
+    overlap = "x" * 250
+    assert _stitch_responses("a" + overlap, overlap + "b") == "a" + overlap + "x" * 50 + "b"
+
+
+def test_llm_response_cache_roundtrip(tmp_path):
+    cache_dir = str(tmp_path / "llm_cache")
+    assert load_cached_llm_response(cache_dir, "prompt") is None
+
+    save_cached_llm_response(cache_dir, "prompt", "[START_JSON]{}[END_JSON]")
+    assert load_cached_llm_response(cache_dir, "prompt") == "[START_JSON]{}[END_JSON]"
+    assert load_cached_llm_response(cache_dir, "other prompt") is None
+
+
+def test_llm_response_cache_is_namespaced(tmp_path):
+    cache_dir = str(tmp_path / "llm_cache")
+    save_cached_llm_response(cache_dir, "prompt", "from model a", namespace="ModelA")
+    assert load_cached_llm_response(cache_dir, "prompt", namespace="ModelA") == "from model a"
+    assert load_cached_llm_response(cache_dir, "prompt", namespace="ModelB") is None
+    assert load_cached_llm_response(cache_dir, "prompt") is None
+
+
+def test_build_prompts_match_template_format():
+    text = "Alice works for {Acme} }{"
+    assert build_extraction_prompt(text) == extraction_prompt_template.format(text=text)
+    assert build_summary_prompt(text) == summary_prompt_template.format(text=text)
+
+
+def test_retry_delay_grows_exponentially_with_cap():
+    for attempt, full_delay in [(1, 1.0), (2, 2.0), (3, 4.0), (10, llm_utils.LLM_RETRY_MAX_DELAY)]:
+        assert full_delay / 2 <= _retry_delay(attempt) <= full_delay
+
+
+def test_async_llm_call_backs_off_between_failed_attempts():
+    llm = SimpleNamespace(acomplete=AsyncMock(side_effect=[TimeoutError("timed out"), SimpleNamespace(text="[START_JSON]{}[END_JSON]", raw=None)]))
+    sleep = AsyncMock()
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)), patch.object(llm_utils.asyncio, "sleep", sleep):
+        assert asyncio.run(_aget_full_llm_response_with_continuation("prompt")) == "[START_JSON]{}[END_JSON]"
+    sleep.assert_awaited_once()
+    assert 0.5 <= sleep.await_args.args[0] <= 1.0
+
+    llm.acomplete = AsyncMock(side_effect=ConnectionError("down"))
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)), patch.object(llm_utils.asyncio, "sleep", AsyncMock()):
+        with pytest.raises(ConnectionError, match="down"):
+            asyncio.run(_aget_full_llm_response_with_continuation("prompt", max_continuation_attempts=2))
+    assert llm.acomplete.await_count == 2
+
+
+def test_async_llm_call_raises_non_transient_errors_immediately():
+    llm = SimpleNamespace(acomplete=AsyncMock(side_effect=ValueError("invalid api key")))
+    sleep = AsyncMock()
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)), patch.object(llm_utils.asyncio, "sleep", sleep):
+        with pytest.raises(ValueError, match="invalid api key"):
+            asyncio.run(_aget_full_llm_response_with_continuation("prompt"))
+    assert llm.acomplete.await_count == 1
+    sleep.assert_not_awaited()
+
+
+def test_is_retryable_error():
+    class StatusError(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    class ClientError(Exception):
+        def __init__(self, code):
+            self.response = {"Error": {"Code": code}}
+
+    assert _is_retryable_error(TimeoutError()) and _is_retryable_error(ConnectionResetError())
+    assert _is_retryable_error(StatusError(429)) and _is_retryable_error(StatusError(529))
+    assert _is_retryable_error(ClientError("ThrottlingException"))
+    assert not _is_retryable_error(StatusError(401)) and not _is_retryable_error(StatusError(400))
+    assert not _is_retryable_error(ClientError("AccessDeniedException"))
+    assert not _is_retryable_error(NotImplementedError()) and not _is_retryable_error(KeyError("bug"))
+
+
+def test_build_batch_extraction_prompt_numbers_chunks():
+    prompt = build_batch_extraction_prompt(["東京の本社", "{not a field}"])
+    assert "[CHUNK 1]\n東京の本社\n\n[CHUNK 2]\n{not a field}" in prompt
+    assert '"chunk": 1' in prompt and "{{" not in prompt
+
+
+def test_sync_llm_call_continues_with_complete():
+    # The first part is cut off mid-JSON, so a continuation request is made and stitched on
+    parts = [SimpleNamespace(text='[START_JSON]{"a": [1, 2', raw=None), SimpleNamespace(text='[1, 2, 3]}[END_JSON]', raw=None)]
+    llm = SimpleNamespace(complete=Mock(side_effect=parts), acomplete=AsyncMock())
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)):
+        assert _get_full_llm_response_with_continuation("prompt") == '[START_JSON]{"a": [1, 2, 3]}[END_JSON]'
+    assert llm.complete.call_count == 2
+    llm.acomplete.assert_not_awaited()
+
+
+def test_sync_llm_call_backs_off_and_raises_non_transient_errors():
+    llm = SimpleNamespace(complete=Mock(side_effect=[ConnectionError("reset"), SimpleNamespace(text="[START_JSON]{}[END_JSON]", raw=None)]))
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)), patch.object(llm_utils.time, "sleep") as sleep:
+        assert _get_full_llm_response_with_continuation("prompt") == "[START_JSON]{}[END_JSON]"
+    sleep.assert_called_once()
+
+    llm = SimpleNamespace(complete=Mock(side_effect=PermissionError("denied")))
+    with patch.object(llm_utils, "Settings", SimpleNamespace(llm=llm)), patch.object(llm_utils.time, "sleep") as sleep:
+        with pytest.raises(PermissionError):
+            _get_full_llm_response_with_continuation("prompt")
+    assert llm.complete.call_count == 1
+    sleep.assert_not_called()
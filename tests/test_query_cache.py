@@ -0,0 +1,112 @@
+"""
+Unit tests for QueryCache
+"""
+
+from unittest.mock import patch
+
+from graphrag_anthropic_llamaindex.query_cache import (
+    QueryCache,
+    SemanticQueryCache,
+    make_query_cache_key,
+    normalize_query,
+)
+
+
+def test_put_and_get():
+    cache = QueryCache(max_size=4, ttl_seconds=60)
+    key = make_query_cache_key("query", "global")
+    assert cache.get(key) is None
+    cache.put(key, "response")
+    assert cache.get(key) == "response"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_size=2, ttl_seconds=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_expiry():
+    cache = QueryCache(max_size=4, ttl_seconds=10)
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_clear_and_disabled_cache():
+    cache = QueryCache(max_size=4)
+    cache.put("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+
+    disabled = QueryCache.from_config({"query_cache": {"enabled": False}})
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
+
+
+def test_cache_key_normalization():
+    key1 = make_query_cache_key(normalize_query("  what   is  GraphRAG? "), "global", 0)
+    key2 = make_query_cache_key(normalize_query("what is GraphRAG?"), "global", 0)
+    key3 = make_query_cache_key(normalize_query("what is GraphRAG?"), "local", 0)
+    assert key1 == key2
+    assert key1 != key3
+
+
+def test_semantic_cache_matches_similar_embeddings():
+    cache = SemanticQueryCache(max_size=4, threshold=0.95)
+    cache.add(("global",), [1.0, 0.0, 0.0], "response")
+    assert cache.lookup(("global",), [0.99, 0.05, 0.0]) == "response"
+    assert cache.lookup(("global",), [0.0, 1.0, 0.0]) is None
+    # Different partitions never match each other
+    assert cache.lookup(("local",), [1.0, 0.0, 0.0]) is None
+
+
+def test_semantic_cache_ring_buffer_and_disabled():
+    cache = SemanticQueryCache(max_size=2, threshold=0.99)
+    cache.add("p", [1.0, 0.0], "a")
+    cache.add("p", [0.0, 1.0], "b")
+    cache.add("p", [-1.0, 0.0], "c")  # overwrites the oldest entry ("a")
+    assert cache.lookup("p", [1.0, 0.0]) is None
+    assert cache.lookup("p", [-1.0, 0.0]) == "c"
+
+    disabled = SemanticQueryCache.from_config({})
+    disabled.add("p", [1.0, 0.0], "a")
+    assert disabled.lookup("p", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_ttl_expiry():
+    cache = SemanticQueryCache(max_size=4, threshold=0.95, ttl_seconds=10)
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=100.0):
+        cache.add("p", [1.0, 0.0], "old")
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=105.0):
+        cache.add("p", [0.0, 1.0], "new")
+        assert cache.lookup("p", [1.0, 0.0]) == "old"
+    with patch("graphrag_anthropic_llamaindex.query_cache.time.monotonic", return_value=111.0):
+        # The identical (cosine 1.0) entry has expired, the fresh one is not similar enough
+        assert cache.lookup("p", [1.0, 0.0]) is None
+        assert cache.lookup("p", [0.0, 1.0]) == "new"
+
+    from_config = SemanticQueryCache.from_config({"semantic_cache": {"enabled": True}, "query_cache": {"ttl_seconds": 30}})
+    assert from_config.ttl_seconds == 30
+
+
+def test_cosine_topk_orders_by_similarity():
+    import numpy as np
+    from graphrag_anthropic_llamaindex.simsearch_kernels import cosine_topk
+
+    mat = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+    indices, scores = cosine_topk(mat, np.array([0.0, 1.0], dtype=np.float32), 2)
+    assert indices.tolist() == [1, 2]
+    assert np.allclose(scores, [1.0, 0.8])